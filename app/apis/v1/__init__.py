@@ -1,47 +1,34 @@
 # backend/app/apis/v1/__init__.py
 
+import importlib
+import sys
+
 from fastapi import APIRouter
-from app.core.config import settings
 
-# Import all route modules
-from app.apis.v1 import (
-    auth,
-    trades,
-    strategies,
-    brokers,
-    news,
-    metrics,
-    admin 
+# Single registration table: (module, prefix, tags, attribute).
+# Ordered hottest-first — Starlette resolves a request by linearly
+# scanning the route table, so the endpoints that serve the dashboard on
+# every refresh (trades, chat, strategies, metrics) should be matched
+# before the rarely-hit auth/admin surface.
+# Admin keeps its hard-coded "/admin" prefix to match the Frontend's
+# request path (previously settings.ADMIN_PANEL_PATH).
+_ROUTE_MODULES = (
+    ("app.apis.v1.trades", "/trades", ["Trades"]),
+    ("app.apis.v1.chat.router", "/chat", ["AI Chat"]),
+    ("app.apis.v1.strategies", "/strategies", ["Strategies"]),
+    ("app.apis.v1.metrics", "/metrics", ["Metrics"]),
+    ("app.apis.v1.auth", "/auth", ["Auth"]),
+    ("app.apis.v1.brokers", "/brokers", ["Brokers"]),
+    ("app.apis.v1.news", "/news", ["News"]),
+    ("app.apis.v1.admin", "/admin", ["Admin Panel"]),
 )
-from app.apis.v1.chat.router import router as chat_router
 
 api_router = APIRouter()
 
-# 1. Authentication Router
-api_router.include_router(auth.router, prefix="/auth", tags=["Auth"])
-
-# 2. Trades Router
-api_router.include_router(trades.router, prefix="/trades", tags=["Trades"])
-
-# 3. Strategies Router
-api_router.include_router(strategies.router, prefix="/strategies", tags=["Strategies"])
-
-# 4. AI Chat Router
-api_router.include_router(chat_router, prefix="/chat", tags=["AI Chat"])
-
-# 5. Brokers Router
-api_router.include_router(brokers.router, prefix="/brokers", tags=["Brokers"])
-
-# 6. News Router
-api_router.include_router(news.router, prefix="/news", tags=["News"])
-
-# 7. Metrics & Telemetry Router
-api_router.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
-
-# 8. ✅ FIXED: Admin Panel Router
-# We manually set prefix="/admin" to match the Frontend's request path.
-api_router.include_router(
-    admin.router, 
-    prefix="/admin",   # <--- Changed from settings.ADMIN_PANEL_PATH to "/admin"
-    tags=["Admin Panel"]
-)
\ No newline at end of file
+# Local binds keep the assembly loop to plain LOAD_FAST lookups; modules
+# already imported (e.g. by main.py) come straight out of sys.modules.
+_import = importlib.import_module
+_include = api_router.include_router
+for _module_path, _prefix, _tags in _ROUTE_MODULES:
+    _module = sys.modules.get(_module_path) or _import(_module_path)
+    _include(_module.router, prefix=_prefix, tags=_tags)
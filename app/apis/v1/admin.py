@@ -1,6 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Body, Request # ✅ Added Request
 from typing import Dict, Any, List, Optional
+from fastapi.responses import Response
 from pydantic import BaseModel
+from cachetools import TTLCache
+import hashlib
+import orjson
 
 from app.core.database import db
 from app.auth.permissions import RoleChecker
@@ -33,31 +37,76 @@ class ProfileUpdate(BaseModel):
     full_name: Optional[str] = None
     role: Optional[str] = None
 
+class AdminUserUpdate(BaseModel):
+    """Combined payload for the bulk-edit PATCH — any subset of fields."""
+    full_name: Optional[str] = None
+    role: Optional[str] = None
+    plan_tier: Optional[str] = None
+    is_banned: Optional[bool] = None
+
 # ---------------------------------------------------------
 # Endpoint 1: Admin Stats
 # ---------------------------------------------------------
+# The summary tolerates short staleness, so cache the computed dict for
+# 10s — at the dashboard's 60/min polling rate the steady state is a
+# dict lookup, not a DB query.
+_summary_cache: TTLCache = TTLCache(maxsize=1, ttl=10)
+
 @router.get("/stats/summary", dependencies=[Depends(allow_admin)])
 @limiter.limit("60/minute") # ✅ Admin Dashboard Load
 async def get_admin_summary(request: Request):
+    cached = _summary_cache.get("summary")
+    if cached is not None:
+        return cached
     try:
-        total_users = await db.fetch_val("SELECT COUNT(*) FROM user_profiles") or 0
-        active_today = await db.fetch_val("""
-            SELECT COUNT(*) FROM user_profiles 
-            WHERE last_active_at > NOW() - INTERVAL '24 hours'
-        """) or 0
-        return {
-            "total_users": total_users,
-            "active_24h": active_today,
+        # Counts and the latest PERFORMANCE_REPORT in one statement: the
+        # CTEs share a single parse, plan, and network round-trip instead
+        # of three separate queries.
+        row = await db.fetch_one("""
+            WITH u AS (
+                SELECT COUNT(*) AS total,
+                       COUNT(*) FILTER (WHERE last_active_at > NOW() - INTERVAL '24 hours') AS active_24h
+                FROM user_profiles
+            ),
+            p AS (
+                SELECT details
+                FROM user_events
+                WHERE event_type = 'PERFORMANCE_REPORT'
+                ORDER BY created_at DESC
+                LIMIT 1
+            )
+            SELECT u.total, u.active_24h, p.details AS latest_report
+            FROM u LEFT JOIN p ON TRUE
+        """)
+        latest_report = (row["latest_report"] if row else None) or {}
+        summary = {
+            "total_users": row["total"] if row else 0,
+            "active_24h": row["active_24h"] if row else 0,
             "current_errors": 0,
-            "db_pool_status": "Healthy"
+            "db_pool_status": "Healthy" if latest_report.get("db_pool") or db.is_connected else "Error",
+            "latest_report": latest_report,
         }
+        _summary_cache["summary"] = summary
+        return summary
     except Exception as e:
         print(f"[Admin Stats Error] {e}")
-        return {"total_users": 0, "active_24h": 0, "current_errors": 0, "db_pool_status": "Error"}
+        return {"total_users": 0, "active_24h": 0, "current_errors": 0, "db_pool_status": "Error", "latest_report": {}}
 
 # ---------------------------------------------------------
 # Endpoint 2: Global Configuration (Plans)
 # ---------------------------------------------------------
+# Plan definitions are process-lifetime constants, so the response body
+# and its ETag are computed exactly once at import; each request hands
+# pre-built bytes to Starlette — no Pydantic, no JSON encoder — and a
+# polling dashboard that already holds the body gets an empty 304.
+_PLANS_JSON = orjson.dumps({
+    "plans": settings.PLAN_DEFINITIONS,
+    "default_plan": settings.DEFAULT_PLAN,
+    "order": settings.PLAN_ORDER
+})
+_PLANS_ETAG = f'W/"{hashlib.blake2b(_PLANS_JSON, digest_size=8).hexdigest()}"'
+_PLANS_HEADERS = {"ETag": _PLANS_ETAG, "Cache-Control": "private, max-age=300"}
+
 @router.get("/config/plans", dependencies=[Depends(allow_admin)])
 @limiter.limit("60/minute") # ✅ Admin Config Load
 async def get_plans_config(request: Request):
@@ -65,11 +114,9 @@ async def get_plans_config(request: Request):
     Returns the centralized plan definitions from config.py.
     This allows the Admin UI to show limits dynamically.
     """
-    return {
-        "plans": settings.PLAN_DEFINITIONS,
-        "default_plan": settings.DEFAULT_PLAN,
-        "order": settings.PLAN_ORDER
-    }
+    if request.headers.get("if-none-match") == _PLANS_ETAG:
+        return Response(status_code=304, headers=_PLANS_HEADERS)
+    return Response(content=_PLANS_JSON, media_type="application/json", headers=_PLANS_HEADERS)
 
 # ---------------------------------------------------------
 # Endpoint 3: User Management (Write Operations)
@@ -93,7 +140,8 @@ async def ban_user(request: Request, user_id: str, body: BanUpdate):
         WHERE id = $1
         RETURNING id
     """
-    status_val = '"banned"' if body.is_banned else '"active"'
+    # Plain str binds as a jsonb string via the pool's orjson codec.
+    status_val = "banned" if body.is_banned else "active"
     updated = await db.fetch_one(query, user_id, status_val)
     
     if not updated:
@@ -130,13 +178,18 @@ async def update_user_plan(request: Request, user_id: str, body: PlanUpdate):
 
     return {"message": "Plan updated", "new_plan": updated['plan_tier']}
 
-@router.put("/users/{user_id}/profile", dependencies=[Depends(allow_admin)])
+@router.patch("/users/{user_id}", dependencies=[Depends(allow_admin)])
 @limiter.limit("30/minute") # ✅ Critical Action Protection
-async def update_user_profile(request: Request, user_id: str, body: ProfileUpdate):
+async def update_user(request: Request, user_id: str, body: AdminUserUpdate):
+    """
+    Combined admin edit: profile fields, plan, and ban status in ONE
+    UPDATE. The bulk-edit UI previously chained three endpoints — three
+    DB round-trips and three cache invalidations for a single form save.
+    """
     fields = []
-    values = [user_id]
+    values: List[Any] = [user_id]
     idx = 2
-    
+
     if body.full_name is not None:
         fields.append(f"full_name = ${idx}")
         values.append(body.full_name)
@@ -145,12 +198,57 @@ async def update_user_profile(request: Request, user_id: str, body: ProfileUpdat
         fields.append(f"role = ${idx}")
         values.append(body.role)
         idx += 1
-        
+    if body.plan_tier is not None:
+        if body.plan_tier.upper() not in settings.PLAN_DEFINITIONS:
+            raise HTTPException(status_code=400, detail=f"Invalid plan. Options: {settings.PLAN_ORDER}")
+        fields.append(f"plan_tier = ${idx}, active_plan_id = ${idx}")
+        values.append(body.plan_tier.upper())
+        idx += 1
+    if body.is_banned is not None:
+        fields.append(
+            f"preferences = jsonb_set(COALESCE(preferences, '{{}}'), '{{account_status}}', ${idx})"
+        )
+        values.append("banned" if body.is_banned else "active")
+        idx += 1
+
     if not fields:
         raise HTTPException(status_code=400, detail="No fields to update")
-        
-    query = f"UPDATE public.user_profiles SET {', '.join(fields)} WHERE id = $1 RETURNING id"
+
+    query = f"""
+        UPDATE public.user_profiles
+        SET {', '.join(fields)}, updated_at = NOW()
+        WHERE id = $1
+        RETURNING id
+    """
     updated = await db.fetch_one(query, *values)
+
+    if not updated:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # Cache is in-process, so invalidation is a dict pop — cheap enough
+    # to keep on the request path so the change takes effect instantly.
+    invalidate_user_cache(user_id)
+
+    return {"message": "User updated"}
+
+@router.put("/users/{user_id}/profile", dependencies=[Depends(allow_admin)])
+@limiter.limit("30/minute") # ✅ Critical Action Protection
+async def update_user_profile(request: Request, user_id: str, body: ProfileUpdate):
+    if body.full_name is None and body.role is None:
+        raise HTTPException(status_code=400, detail="No fields to update")
+
+    # One canonical statement regardless of which fields were sent:
+    # COALESCE keeps the current value for absent fields, so asyncpg's
+    # prepared-plan cache always hits instead of seeing a different SQL
+    # string per field combination.
+    query = """
+        UPDATE public.user_profiles
+        SET full_name = COALESCE($2, full_name),
+            role = COALESCE($3, role)
+        WHERE id = $1
+        RETURNING id
+    """
+    updated = await db.fetch_one(query, user_id, body.full_name, body.role)
     
     if not updated:
         raise HTTPException(status_code=404, detail="User not found")
@@ -1,27 +1,40 @@
 # backend/app/apis/v1/auth.py
+import uuid
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict, Any, Optional
 from pydantic import BaseModel
 import logging
 
+import orjson
+
 # 1. IMPORT THE CACHE directly from the dependency file
 from app.auth.dependency import get_current_user, _USER_CACHE
-
-import os
-from supabase import create_client, Client
-
-# Initialize Supabase Client
-url = os.environ.get("SUPABASE_URL")
-key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-supabase: Client = create_client(url, key)
+from app.core.database import db
 
 router = APIRouter()
 logger = logging.getLogger("uvicorn.error")
 
+# 'full_name' was removed: user_profiles doesn't accept it through this
+# endpoint, and the old handler silently stripped it after validating it.
 class UserUpdate(BaseModel):
-    full_name: Optional[str] = None
     preferences: Optional[Dict[str, Any]] = None
 
+def _serialize_profile(row: Any) -> Dict[str, Any]:
+    """Converts asyncpg row types (UUID, datetime, jsonb text) into JSON-friendly values."""
+    d = dict(row)
+    for k, v in d.items():
+        if isinstance(v, uuid.UUID):
+            d[k] = str(v)
+        elif isinstance(v, datetime):
+            d[k] = v.isoformat()
+    if isinstance(d.get("preferences"), str):
+        try:
+            d["preferences"] = orjson.loads(d["preferences"])
+        except orjson.JSONDecodeError:
+            pass
+    return d
+
 @router.get("/me", response_model=Dict[str, Any])
 async def read_users_me(current_user: Dict[str, Any] = Depends(get_current_user)):
     return current_user
@@ -37,43 +50,43 @@ async def update_user_me(
     if not user_id:
         raise HTTPException(status_code=400, detail="User ID not found in session")
 
-    # 2. Filter data
-    update_data = {k: v for k, v in user_update.dict().items() if v is not None}
-    
-    if not update_data:
-        return current_user
+    # 2. Filter data — exclude_unset runs in pydantic-core (Rust) and
+    # gives correct PATCH semantics: only fields the client actually sent.
+    update_data = user_update.model_dump(exclude_unset=True)
 
-    # ✅ SAFEGUARD: Remove 'full_name' if schema doesn't support it
-    if "full_name" in update_data:
-        update_data.pop("full_name")
-
-    # If nothing left to update, just return
     if not update_data:
         return current_user
 
-    logger.info(f"🔄 Updating 'user_profiles' for {user_id}: {update_data}")
+    logger.info("🔄 Updating 'user_profiles' for %s: %s", user_id, update_data)
 
     try:
-        # 3. Perform Update
-        response = supabase.table("user_profiles").update(update_data).eq("id", user_id).execute()
-        
+        # 3. Perform Update — straight on the asyncpg pool. The old
+        # supabase-py call was sync httpx under the hood and stalled the
+        # event loop for a full PostgREST round-trip per profile save.
+        row = await db.fetch_one("""
+            UPDATE user_profiles
+            SET preferences = $2::jsonb, updated_at = NOW()
+            WHERE id = $1
+            RETURNING *
+        """, user_id, update_data["preferences"])
+
         # ---------------------------------------------------------
         # 4. CACHE INVALIDATION (The Fix)
         # ---------------------------------------------------------
-        # Immediately remove the user from cache. 
+        # Immediately remove the user from cache.
         # The next request will be forced to fetch the new data from DB.
         if user_id in _USER_CACHE:
             del _USER_CACHE[user_id]
-            logger.info(f"🧹 Cache cleared for user {user_id}")
+            logger.info("🧹 Cache cleared for user %s", user_id)
         # ---------------------------------------------------------
 
-        if not response.data:
-            logger.warning(f"⚠️ Update succeeded but no row returned. Check if ID {user_id} exists in 'user_profiles'.")
+        if not row:
+            logger.warning("⚠️ Update succeeded but no row returned. Check if ID %s exists in 'user_profiles'.", user_id)
             return {**current_user, **update_data}
 
-        updated_profile = response.data[0]
+        updated_profile = _serialize_profile(row)
         return {**current_user, **updated_profile}
 
     except Exception as e:
-        logger.error(f"❌ DATABASE ERROR: {str(e)}")
+        logger.error("❌ DATABASE ERROR: %s", e)
         raise HTTPException(status_code=500, detail=f"Database Update Failed: {str(e)}")
\ No newline at end of file
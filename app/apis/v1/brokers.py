@@ -1,18 +1,27 @@
 # backend/app/apis/v1/brokers.py
 
+import asyncio
+import hashlib
+import hmac
+import itertools
 import logging
-import json
 import secrets
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from cachetools import TTLCache
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request
 from fastapi.responses import RedirectResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, Field
-from supabase import create_client, Client
+import httpx
+import orjson
+from postgrest import AsyncPostgrestClient, DEFAULT_POSTGREST_CLIENT_HEADERS
+from pydantic import BaseModel, Field, model_validator
 
 from app.core.config import settings
+from app.core.database import db
 from app.auth.dependency import get_current_user
 from app.lib.encryption import crypto
 from app.lib.brokers.factory import get_broker_adapter
@@ -24,6 +33,27 @@ router = APIRouter()
 security = HTTPBearer()
 logger = logging.getLogger(__name__)
 
+# orjson for credential/state payloads: these (de)serializations sit on
+# every broker request, and the Rust encoder avoids Python-level string
+# building. All payloads here are plain dicts of strings.
+def _dumps(obj: Any) -> str:
+    return orjson.dumps(obj).decode()
+
+_loads = orjson.loads
+
+# Deploy-time constants bound once at import: module-global loads beat
+# repeated attribute fetches on the settings instance inside handlers,
+# and these values never change for the life of the process.
+# getattr: FRONTEND_URL isn't a declared Settings field, and the
+# callback shouldn't crash a deploy that never configured it.
+_FRONTEND_URL = getattr(settings, "FRONTEND_URL", "")
+_SERVICE_ROLE_KEY = settings.SUPABASE_SERVICE_ROLE_KEY
+
+# Brokers that may only be connected via OAuth, never manual API keys.
+# Exact casefolded membership: one hash probe, and no false positives on
+# names that merely contain the substring.
+_OAUTH_ONLY_BROKERS = frozenset({"dhan"})
+
 
 # -----------------------
 # Pydantic Models
@@ -36,7 +66,12 @@ class BrokerBase(BaseModel):
 
 
 class BrokerCreate(BrokerBase):
-    pass
+    @model_validator(mode="after")
+    def _require_api_key(self) -> "BrokerCreate":
+        # OAuth-only brokers (Dhan) carry no key here; everyone else must.
+        if self.broker_name.casefold() not in _OAUTH_ONLY_BROKERS and not self.api_key:
+            raise ValueError("api_key is required for API-key based brokers")
+        return self
 
 
 class BrokerResponse(BaseModel):
@@ -51,26 +86,69 @@ class BrokerResponse(BaseModel):
 # -----------------------
 # Supabase Dependency
 # -----------------------
-def get_authenticated_client(
+
+# Shared pooled transport for every per-request supabase client: HTTP/2
+# multiplexes concurrent PostgREST queries over a few warm TLS
+# connections instead of paying TCP+TLS setup per burst.
+_postgrest_http = httpx.AsyncClient(
+    http2=True,
+    timeout=httpx.Timeout(10.0, connect=2.0),
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=60.0),
+)
+
+_POSTGREST_URL = f"{settings.SUPABASE_URL}/rest/v1"
+
+# Dedicated service-role client for the background sync job. Built once
+# (it is just headers + URL over the shared pool) and NEVER rebound via
+# auth(), so nothing can clobber its credentials mid-job and it cannot
+# leak service-role access into user-scoped requests.
+_service_postgrest = AsyncPostgrestClient(
+    _POSTGREST_URL,
+    headers={
+        **DEFAULT_POSTGREST_CLIENT_HEADERS,
+        "apikey": _SERVICE_ROLE_KEY,
+        "Authorization": f"Bearer {_SERVICE_ROLE_KEY}",
+    },
+    http_client=_postgrest_http,
+)
+
+
+async def get_authenticated_client(
     creds: HTTPAuthorizationCredentials = Depends(security),
-) -> Client:
+) -> AsyncPostgrestClient:
     token = creds.credentials
-    client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
-    client.postgrest.auth(token)
-    return client
+    # Thin per-request PostgREST client over the shared pooled transport.
+    # postgrest's auth() mutates client-level headers, so rebinding a JWT
+    # on a shared client races: any await between the rebind and
+    # .execute() lets a concurrent request swap the Authorization header
+    # and run this query under someone else's RLS context. A fresh
+    # client per request is just a headers dict + URL — no new
+    # connection pool — so isolation costs nothing measurable.
+    return AsyncPostgrestClient(
+        _POSTGREST_URL,
+        headers={
+            **DEFAULT_POSTGREST_CLIENT_HEADERS,
+            "apikey": _SERVICE_ROLE_KEY,
+            "Authorization": f"Bearer {token}",
+        },
+        http_client=_postgrest_http,
+    )
 
 
 # -----------------------
 # Basic endpoints (listing / manual add for API-key brokers)
 # -----------------------
-@router.get("/", response_model=List[BrokerResponse])
-def get_brokers(
+# response_model dropped: the SELECT column list IS the response shape,
+# so re-validating every row through pydantic is pure overhead. The model
+# stays in 'responses' purely for the OpenAPI docs.
+@router.get("/", response_model=None, responses={200: {"model": List[BrokerResponse]}})
+async def get_brokers(
     current_user: Dict[str, Any] = Depends(get_current_user),
-    supabase: Client = Depends(get_authenticated_client),
+    supabase: AsyncPostgrestClient = Depends(get_authenticated_client),
 ):
     try:
-        user_id = current_user["sub"]
-        res = (
+        user_id = current_user["user_id"]
+        res = await (
             supabase.table("broker_accounts")
             .select("id, broker_name, api_key_last_digits, last_sync_time, is_active, created_at")
             .eq("user_id", user_id)
@@ -84,21 +162,21 @@ def get_brokers(
 
 
 @router.post("/", response_model=BrokerResponse, status_code=status.HTTP_201_CREATED)
-def add_broker(
+async def add_broker(
     broker: BrokerCreate,
     current_user: Dict[str, Any] = Depends(get_current_user),
-    supabase: Client = Depends(get_authenticated_client),
+    supabase: AsyncPostgrestClient = Depends(get_authenticated_client),
 ):
     """
     Manual add for API-key based brokers only. Dhan must be connected via OAuth.
     """
-    user_id = current_user["sub"]
+    user_id = current_user["user_id"]
 
-    if "dhan" in broker.broker_name.lower():
+    if broker.broker_name.casefold() in _OAUTH_ONLY_BROKERS:
         raise HTTPException(status_code=400, detail="Please use Connect Dhan (OAuth) to authenticate.")
 
     try:
-        creds_payload = json.dumps({"api_key": broker.api_key, "api_secret": broker.api_secret})
+        creds_payload = _dumps({"api_key": broker.api_key, "api_secret": broker.api_secret})
         encrypted_creds = crypto.encrypt(creds_payload)
         last_digits = broker.api_key[-4:] if broker.api_key and len(broker.api_key) >= 4 else "****"
 
@@ -111,57 +189,72 @@ def add_broker(
             "last_sync_time": None,
         }
 
-        res = supabase.table("broker_accounts").insert(data).execute()
-        if not res.data:
-            raise HTTPException(status_code=500, detail="Failed to save broker account")
-        return res.data[0]
+        res = await supabase.table("broker_accounts").insert(data).execute()
     except Exception as e:
         logger.exception("Error adding broker: %s", e)
         raise HTTPException(status_code=500, detail="Failed to add broker")
 
+    # Expected empty-result branch handled explicitly, outside the
+    # network-I/O try block.
+    if not res.data:
+        raise HTTPException(status_code=500, detail="Failed to save broker account")
+    return res.data[0]
+
 
 # -----------------------
 # Dhan OAuth Flow
 # -----------------------
+# State only needs to be unforgeable and bound to the user — it carries
+# no secret. An HMAC-SHA256 tag (C-accelerated) is far cheaper than the
+# previous Fernet encrypt/decrypt round-trip and drops the JSON step.
+_STATE_KEY = (settings.SECRET_KEY or settings.SUPABASE_JWT_SECRET or "").encode()
+_STATE_TTL_SECONDS = 600
+
+
 def _build_state_for_user(user_id: str) -> str:
     """
-    Build a short-lived encrypted state containing user_id and nonce to avoid CSRF.
+    Build a short-lived HMAC-signed state binding user_id and a nonce to avoid CSRF.
+    Format: "<user_id>.<nonce>.<issued_ts>.<mac>".
     """
-    payload = {"user_id": user_id, "nonce": secrets.token_urlsafe(16), "iat": datetime.utcnow().isoformat()}
-    return crypto.encrypt(json.dumps(payload))
+    msg = f"{user_id}.{secrets.token_urlsafe(16)}.{int(time.time())}"
+    mac = hmac.new(_STATE_KEY, msg.encode(), hashlib.sha256).hexdigest()[:32]
+    return f"{msg}.{mac}"
 
 
 def _validate_state_for_user(state: str, expected_user_id: str) -> bool:
     try:
-        raw = crypto.decrypt(state)
-        payload = json.loads(raw)
-        return str(payload.get("user_id")) == str(expected_user_id)
+        msg, mac = state.rsplit(".", 1)
+        user_id, _nonce, ts = msg.split(".")
+        expected_mac = hmac.new(_STATE_KEY, msg.encode(), hashlib.sha256).hexdigest()[:32]
+        if not hmac.compare_digest(mac, expected_mac):
+            return False
+        if int(time.time()) - int(ts) > _STATE_TTL_SECONDS:
+            return False
+        return user_id == str(expected_user_id)
     except Exception:
         logger.exception("Invalid state value provided")
         return False
 
 
+# clientId and the URL-encoded redirect URI are deploy-time constants, so
+# the authorize URL prefix is built once at import; per request only the
+# state parameter varies. None when Dhan isn't configured.
+_DHAN_AUTHORIZE_PREFIX = (
+    "https://dhan.co/login"
+    f"?clientId={settings.DHAN_CLIENT_ID}"
+    f"&redirectUri={quote(settings.DHAN_REDIRECT_URI, safe='')}"
+) if settings.DHAN_CLIENT_ID and settings.DHAN_REDIRECT_URI else None
+
+
 @router.get("/dhan/auth-url")
 def get_dhan_auth_url(
     current_user: Dict[str, Any] = Depends(get_current_user),
 ):
-    if not settings.DHAN_CLIENT_ID or not settings.DHAN_REDIRECT_URI:
+    if _DHAN_AUTHORIZE_PREFIX is None:
         raise HTTPException(status_code=500, detail="Dhan not configured on server")
 
-    user_id = current_user["sub"]
-    state = _build_state_for_user(user_id)
-
-    # ✅ URL-ENCODE redirect URI
-    encoded_redirect = quote(settings.DHAN_REDIRECT_URI, safe="")
-
-    authorize_url = (
-        "https://dhan.co/login"
-        f"?clientId={settings.DHAN_CLIENT_ID}"
-        f"&redirectUri={encoded_redirect}"
-        f"&state={state}"
-    )
-
-    return {"url": authorize_url}
+    state = _build_state_for_user(current_user["user_id"])
+    return {"url": f"{_DHAN_AUTHORIZE_PREFIX}&state={state}"}
 
 
 @router.get("/dhan/callback")
@@ -174,9 +267,9 @@ def dhan_callback(request: Request):
     token_id = params.get("tokenId") or params.get("token_id") or params.get("code")
     state = params.get("state")
     if not token_id:
-        return RedirectResponse(f"{settings.FRONTEND_URL}/settings/accounts?error=dhan_missing_token")
-    
-    redirect_to = f"{settings.FRONTEND_URL}/settings/accounts?tokenId={token_id}"
+        return RedirectResponse(f"{_FRONTEND_URL}/settings/accounts?error=dhan_missing_token")
+
+    redirect_to = f"{_FRONTEND_URL}/settings/accounts?tokenId={token_id}"
     if state:
         redirect_to += f"&state={state}"
     return RedirectResponse(redirect_to)
@@ -186,12 +279,11 @@ def dhan_callback(request: Request):
 async def connect_dhan_broker(
     payload: Dict[str, str],
     current_user: Dict[str, Any] = Depends(get_current_user),
-    supabase: Client = Depends(get_authenticated_client),
 ):
     """
     Backend endpoint to exchange tokenId -> access_token, validate it, and persist to Supabase.
     """
-    user_id = current_user["sub"]
+    user_id = current_user["user_id"]
     token_id = payload.get("tokenId") or payload.get("token_id")
     state = payload.get("state")
 
@@ -217,58 +309,54 @@ async def connect_dhan_broker(
     creds_obj = {"access_token": access_token}
     if expires_at:
         creds_obj["expires_at"] = expires_at
-    creds_json = json.dumps(creds_obj)
+    creds_json = _dumps(creds_obj)
     encrypted = crypto.encrypt(creds_json)
 
     try:
-        existing = (
-            supabase.table("broker_accounts")
-            .select("id")
-            .eq("user_id", user_id)
-            .eq("broker_name", "Dhan")
-            .execute()
-        )
-        now = datetime.utcnow().isoformat()
-        data = {
-            "user_id": user_id,
-            "broker_name": "Dhan",
-            "encrypted_credentials": encrypted,
-            "api_key_last_digits": "OAUTH",
-            "is_active": True,
-            "last_sync_time": None,
-            "updated_at": now,
-            "created_at": now,
-        }
-
-        if existing.data:
-            supabase.table("broker_accounts").update(
-                {
-                    "encrypted_credentials": encrypted,
-                    "api_key_last_digits": "OAUTH",
-                    "is_active": True,
-                    "last_sync_time": None,
-                    "updated_at": now,
-                }
-            ).eq("id", existing.data[0]["id"]).execute()
-            broker_id = existing.data[0]["id"]
-        else:
-            res = supabase.table("broker_accounts").insert(data).execute()
-            broker_id = res.data[0]["id"]
-
-        return {"status": "ok", "broker_id": broker_id}
+        # Update-or-insert in ONE round-trip: the writable CTE updates an
+        # existing Dhan record, and the INSERT arm only fires when the
+        # UPDATE matched nothing. (ON CONFLICT would need a unique index
+        # on (user_id, broker_name), which the deployed schema doesn't
+        # guarantee; this form needs none.)
+        broker_id = await db.fetch_val("""
+            WITH updated AS (
+                UPDATE broker_accounts
+                SET encrypted_credentials = $3,
+                    api_key_last_digits = 'OAUTH',
+                    is_active = TRUE,
+                    last_sync_time = NULL,
+                    updated_at = NOW()
+                WHERE user_id = $1 AND broker_name = $2
+                RETURNING id
+            ), inserted AS (
+                INSERT INTO broker_accounts (
+                    user_id, broker_name, encrypted_credentials,
+                    api_key_last_digits, is_active, last_sync_time,
+                    created_at, updated_at
+                )
+                SELECT $1, $2, $3, 'OAUTH', TRUE, NULL, NOW(), NOW()
+                WHERE NOT EXISTS (SELECT 1 FROM updated)
+                RETURNING id
+            )
+            SELECT id FROM updated
+            UNION ALL
+            SELECT id FROM inserted
+        """, user_id, "Dhan", encrypted)
+
+        return {"status": "ok", "broker_id": str(broker_id)}
     except Exception as e:
         logger.exception("Failed to persist Dhan broker for user %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Failed to persist Dhan credentials")
 
 
 @router.delete("/{broker_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_broker(
+async def delete_broker(
     broker_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user),
-    supabase: Client = Depends(get_authenticated_client),
+    supabase: AsyncPostgrestClient = Depends(get_authenticated_client),
 ):
     try:
-        res = supabase.table("broker_accounts").delete().eq("id", broker_id).eq("user_id", current_user["sub"]).execute()
+        res = await supabase.table("broker_accounts").delete().eq("id", broker_id).eq("user_id", current_user["user_id"]).execute()
         if not res.data:
             raise HTTPException(status_code=404, detail="Broker not found or access denied")
         return None
@@ -279,88 +367,151 @@ def delete_broker(
         raise HTTPException(status_code=500, detail="Failed to remove broker")
 
 
-@router.post("/{broker_id}/sync")
+# In-process sync job registry: job_id -> status dict. An hour of TTL is
+# plenty — the frontend polls for seconds, not days.
+_SYNC_JOBS: TTLCache = TTLCache(maxsize=1_000, ttl=3600)
+
+# Decrypted-credentials cache keyed by a hash of the ciphertext. Repeat
+# syncs skip the Fernet round-trip + JSON parse; because the key IS the
+# ciphertext, rotating credentials (new ciphertext) misses naturally —
+# no explicit invalidation needed.
+_CREDS_CACHE: TTLCache = TTLCache(maxsize=256, ttl=300)
+
+
+def _decrypt_credentials(encrypted: str) -> Dict[str, Any]:
+    cache_key = hashlib.blake2b(encrypted.encode(), digest_size=16).digest()
+    creds = _CREDS_CACHE.get(cache_key)
+    if creds is None:
+        creds = _loads(crypto.decrypt(encrypted))
+        _CREDS_CACHE[cache_key] = creds
+    return creds
+
+
+async def _run_broker_sync(job_id: str, user_id: str, broker_id: str, broker_name: str, adapter) -> None:
+    """
+    The slow half of a broker sync: external authenticate, 30-day trade
+    fetch, normalization, and the bulk upsert. Runs as a background task
+    after the 202 is sent; progress lands in _SYNC_JOBS for polling.
+    """
+    job = _SYNC_JOBS.get(job_id)
+    if job is None:
+        return
+    job["status"] = "running"
+    try:
+        # 1+2. Authenticate and fetch trades. When the adapter declares
+        # auth independent of the fetch (Dhan: auth is a /fund-limits
+        # ping), overlap both round-trips with gather — the wall time
+        # becomes max(auth, fetch) instead of auth + fetch. If auth fails
+        # the fetched trades are simply discarded (the fetch would have
+        # 401'd anyway). Adapters without the flag keep the serial path.
+        if adapter.auth_is_independent:
+            authed, raw_trades = await asyncio.gather(
+                adapter.authenticate(), adapter.fetch_recent_trades(days=30)
+            )
+        else:
+            authed = await adapter.authenticate()
+            raw_trades = await adapter.fetch_recent_trades(days=30) if authed else []
+
+        if not authed:
+            job.update(status="failed", detail="Broker authentication failed; please reconnect")
+            return
+
+        # 3. Normalize lazily and upsert in fixed-size batches. The
+        # generator keeps memory flat: only one 500-trade batch is ever
+        # materialized alongside raw_trades, however large the sync.
+        # ignore_duplicates=True prevents failure if a trade already exists
+        # (Requires a unique constraint on your 'trades' table, e.g. user_id + symbol + entry_time)
+        normalized = adapter.normalize_trades(raw_trades)
+        inserted = 0
+        while True:
+            batch = list(itertools.islice(normalized, 500))
+            if not batch:
+                break
+            for trade in batch:
+                trade["user_id"] = user_id
+                trade["broker_account_id"] = broker_id
+                trade["source_type"] = "AUTO_SYNC"
+
+            # Service-role write through the job's dedicated client:
+            # ownership fields are stamped explicitly above and the
+            # broker record was already verified user-scoped on the
+            # request path before this job was enqueued.
+            res = await _service_postgrest.table("trades").upsert(batch, ignore_duplicates=True).execute()
+            inserted += len(res.data) if res.data else len(batch)
+
+        # 4. Update sync timestamp (asyncpg — no PostgREST detour needed)
+        await db.execute(
+            "UPDATE broker_accounts SET last_sync_time = NOW() WHERE id = $1 AND user_id = $2",
+            broker_id, user_id,
+        )
+
+        job.update(
+            status="success",
+            trades_synced=inserted,
+            detail=f"Synced {inserted} trades from {broker_name}",
+        )
+    except Exception as e:
+        logger.exception("Background sync failed for broker %s: %s", broker_id, e)
+        job.update(status="failed", detail="Sync failed; please try again")
+
+
+@router.post("/{broker_id}/sync", status_code=status.HTTP_202_ACCEPTED)
 async def sync_broker(
     broker_id: str,
+    background_tasks: BackgroundTasks,
     current_user: Dict[str, Any] = Depends(get_current_user),
-    supabase: Client = Depends(get_authenticated_client),
+    supabase: AsyncPostgrestClient = Depends(get_authenticated_client),
 ):
-    QuotaManager.check_feature_access(current_user, "allow_broker_sync")
-    user_id = current_user["sub"]
+    """
+    Validates and enqueues a sync, returning 202 immediately. The broker
+    round-trips (auth + 30-day fetch + bulk upsert) can take many
+    seconds; holding the HTTP request open for them ties up the worker.
+    Poll GET /{broker_id}/sync/{job_id} for the outcome.
+    """
+    QuotaManager.require_feature(current_user, "allow_broker_sync")
+    user_id = current_user["user_id"]
 
-    # 1. Fetch Broker Record
-    res = supabase.table("broker_accounts").select("*").eq("id", broker_id).eq("user_id", user_id).execute()
+    # 1. Fetch Broker Record (user-scoped — this is the ownership check)
+    res = await supabase.table("broker_accounts").select("*").eq("id", broker_id).eq("user_id", user_id).execute()
     if not res.data:
         raise HTTPException(status_code=404, detail="Broker not found")
 
     broker_record = res.data[0]
 
-    # 2. Decrypt Credentials
+    # 2. Decrypt Credentials (cached by ciphertext hash)
     try:
-        decrypted_json = crypto.decrypt(broker_record["encrypted_credentials"])
-        credentials = json.loads(decrypted_json)
+        credentials = _decrypt_credentials(broker_record["encrypted_credentials"])
     except Exception:
         logger.exception("Decryption failed for broker %s", broker_id)
         raise HTTPException(status_code=500, detail="Failed to decrypt credentials")
 
-    if "dhan" in broker_record["broker_name"].lower():
+    if broker_record["broker_name"].casefold() in _OAUTH_ONLY_BROKERS:
         if "access_token" not in credentials:
             raise HTTPException(status_code=401, detail="Dhan not connected; please reconnect via OAuth")
 
-    # 3. Instantiate adapter
+    # 3. Instantiate adapter — config errors still fail fast with a 400
     try:
         adapter = get_broker_adapter(broker_record["broker_name"], credentials)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    # 4. Authenticate
-    if not await adapter.authenticate():
-        if "dhan" in broker_record["broker_name"].lower():
-            raise HTTPException(status_code=401, detail="Dhan session invalid/expired; please reconnect")
-        raise HTTPException(status_code=401, detail="Broker authentication failed")
+    # 4. Enqueue the slow half and answer immediately
+    job_id = str(uuid.uuid4())
+    _SYNC_JOBS[job_id] = {"status": "queued", "user_id": user_id, "broker_id": broker_id}
+    background_tasks.add_task(
+        _run_broker_sync, job_id, user_id, broker_id, broker_record["broker_name"], adapter
+    )
 
-    # 5. Fetch & normalize trades
-    try:
-        raw_trades = await adapter.fetch_recent_trades(days=30)
-        normalized_trades = adapter.normalize_trades(raw_trades)
-    except Exception as e:
-        logger.exception("Error fetching or normalizing trades: %s", e)
-        raise HTTPException(status_code=502, detail="Failed to fetch trades from broker")
-
-    # -------------------------------------------------------------
-    # 6. OPTIMIZATION: Bulk Upsert (Batch Write)
-    # -------------------------------------------------------------
-    inserted = 0
-    if normalized_trades:
-        # Prepare batch data
-        batch_data = []
-        for trade in normalized_trades:
-            # Add ownership fields to every record
-            trade["user_id"] = user_id
-            trade["broker_account_id"] = broker_id
-            trade["source_type"] = "AUTO_SYNC"
-            batch_data.append(trade)
-
-        try:
-            # Perform a SINGLE database call for all trades
-            # ignore_duplicates=True prevents failure if a trade already exists
-            # (Requires a unique constraint on your 'trades' table, e.g. user_id + symbol + entry_time)
-            res = supabase.table("trades").upsert(batch_data, ignore_duplicates=True).execute()
-            
-            # Count how many rows were affected (approximate)
-            inserted = len(res.data) if res.data else len(batch_data)
-            
-        except Exception as e:
-            logger.error(f"Bulk sync failed for {broker_record['broker_name']}: {e}")
-            # Fallback: detailed logging or partial retry logic could go here
-            raise HTTPException(status_code=500, detail="Database bulk sync failed")
-
-    # 7. Update sync timestamp
-    now = datetime.utcnow().isoformat()
-    supabase.table("broker_accounts").update({"last_sync_time": now}).eq("id", broker_id).execute()
-
-    return {
-        "status": "success", 
-        "message": f"Synced {inserted} trades from {broker_record['broker_name']}", 
-        "trades_synced": inserted
-    }
\ No newline at end of file
+    return {"status": "queued", "job_id": job_id}
+
+
+@router.get("/{broker_id}/sync/{job_id}")
+async def get_sync_status(
+    broker_id: str,
+    job_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    job = _SYNC_JOBS.get(job_id)
+    if not job or job.get("user_id") != current_user["user_id"] or job.get("broker_id") != broker_id:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return {k: v for k, v in job.items() if k != "user_id"}
\ No newline at end of file
@@ -1,17 +0,0 @@
-# backend/app/apis/v1/chat/dependencies.py
-from fastapi import Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from supabase import create_client, Client
-from app.core.config import settings
-
-security = HTTPBearer()
-
-def get_authenticated_client(creds: HTTPAuthorizationCredentials = Depends(security)) -> Client:
-    """
-    Creates a Supabase client authenticated AS THE USER.
-    This ensures RLS policies are automatically enforced.
-    """
-    token = creds.credentials
-    client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
-    client.postgrest.auth(token)
-    return client
\ No newline at end of file
@@ -2,21 +2,26 @@
 
 import logging
 import asyncio
+import hashlib
+import os
+import re
 import uuid
+from datetime import datetime
 from typing import Dict, Any, List, Optional
 
 # ✅ Added 'Request' to imports
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
-from starlette.concurrency import run_in_threadpool
-from supabase import Client
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, BackgroundTasks
+from fastapi.responses import StreamingResponse
+import orjson
 
+from app.core.database import db
 from app.auth.dependency import get_current_user
 # ✅ REMOVED: from app.auth.permissions import validate_ai_usage_limits, check_import_quota
 from app.services.quota_manager import QuotaManager
 from app.services.chat_pipeline import ChatPipeline
 from app.lib.data_sanitizer import sanitizer
 from app.lib.csv_parser import csv_parser
-from app.apis.v1.chat.dependencies import get_authenticated_client
+from app.lib.encryption import crypto
 
 # ✅ Added Limiter Import
 from app.core.limiter import limiter
@@ -27,14 +32,49 @@ from app.schemas.chat_schemas import (
     SessionSchema,
     MessageSchema,
     ChatUsage,
-    SessionUpdate,      
-    UploadResponse,     
-    ImportConfirmSchema 
+    SessionUpdate,
+    UploadResponse,
+    ImportConfirmSchema
 )
 
+from cachetools import TTLCache
+
 logger = logging.getLogger("tradeomen.chat")
 router = APIRouter()
 
+# ------------------------------------------------------------------
+# SESSION OWNERSHIP CACHE
+# ------------------------------------------------------------------
+# Maps session_id -> user_id for sessions whose ownership we've already
+# proven (created here, or a guarded insert succeeded). Lets repeat chat
+# turns skip the EXISTS subquery and — more importantly — reject a
+# foreign session_id BEFORE paying for the LLM call.
+_SESSION_OWNER_CACHE = TTLCache(maxsize=10_000, ttl=300)
+
+# ------------------------------------------------------------------
+# CHAT RESPONSE CACHE
+# ------------------------------------------------------------------
+# Repeat questions ("what's my win rate") are common; each one is a 1-5s
+# LLM round-trip. Cache responses keyed by user + normalized message +
+# the recent-history tail, so an identical turn in an identical context
+# is answered from memory. The history tail in the key guards against
+# context drift: a follow-up that changes the conversation misses. Short
+# TTL because answers are computed over live trading data.
+_CHAT_RESPONSE_CACHE: TTLCache = TTLCache(maxsize=2048, ttl=120)
+
+_CHAT_ERROR_TEXT = "I encountered an error processing your request. Please try again."
+
+
+def _chat_cache_key(user_id: str, message: str, history: List[Dict[str, str]]) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(user_id.encode())
+    h.update(b"\x00")
+    h.update(" ".join(message.casefold().split()).encode())
+    for m in history[-4:]:
+        h.update(b"\x00")
+        h.update(f"{m.get('role', '')}:{m.get('content', '')}".encode())
+    return h.digest()
+
 
 # ---------------------------------------------------------------------
 # Helpers
@@ -46,9 +86,41 @@ def extract_user_id(user: Dict[str, Any]) -> str:
     return str(uid)
 
 
-async def supabase_exec(fn):
-    """Run blocking Supabase SDK calls safely in a threadpool."""
-    return await run_in_threadpool(fn)
+def _serialize_row(row: Any) -> Dict[str, Any]:
+    """Converts asyncpg row types (UUID) into Pydantic-friendly formats."""
+    d = dict(row)
+    for k, v in d.items():
+        if isinstance(v, uuid.UUID):
+            d[k] = str(v)
+    return d
+
+
+async def _persist_chat_turn(
+    user_id: str,
+    session_id: str,
+    message: str,
+    response: str,
+    new_session_topic: Optional[str] = None,
+):
+    """
+    Background persistence for a chat turn whose ownership is already
+    proven. Runs after the response is sent, so the DB round-trip(s)
+    never sit on the user-visible latency path. Failures are logged,
+    never raised — a crash here must not take down the worker.
+    """
+    try:
+        if new_session_topic is not None:
+            # Session id was pre-generated in the handler; create the row
+            # first so the message FK resolves.
+            await db.execute(
+                "INSERT INTO chat_sessions (id, user_id, topic) VALUES ($1, $2, $3)",
+                session_id, user_id, new_session_topic,
+            )
+        await QuotaManager.append_chat_turn(
+            user_id, session_id, message, response, verify_ownership=False,
+        )
+    except Exception as e:
+        logger.error("Background chat persistence failed for session %s: %s", session_id, e)
 
 
 async def _record_usage_background(user_id: str, profile: Dict[str, Any], tokens: int):
@@ -59,27 +131,28 @@ async def _record_usage_background(user_id: str, profile: Dict[str, Any], tokens
         await QuotaManager.increment_daily_chat(user_id)
         pass
     except Exception as e:
-        logger.error(f"Background usage update failed for user {user_id}: {e}")
+        logger.error("Background usage update failed for user %s: %s", user_id, e)
 
 
 # ---------------------------------------------------------------------
 # 1. Sessions
 # ---------------------------------------------------------------------
-@router.get("/sessions", response_model=List[SessionSchema])
+@router.get("/sessions", response_model=None)
 async def get_sessions(
     current_user: Dict[str, Any] = Depends(get_current_user),
-    supabase: Client = Depends(get_authenticated_client),
-):
+) -> List[SessionSchema]:
     user_id = extract_user_id(current_user)
     try:
-        res = await supabase_exec(
-            lambda: supabase.table("chat_sessions")
-            .select("id, topic, created_at")
-            .eq("user_id", user_id)
-            .order("created_at", desc=True)
-            .execute()
-        )
-        return res.data or []
+        rows = await db.fetch_all("""
+            SELECT id, topic, created_at
+            FROM chat_sessions
+            WHERE user_id = $1
+            ORDER BY created_at DESC
+        """, user_id)
+        # model_construct skips per-row validation: these columns come
+        # straight from our own SELECT, so re-validating them is pure
+        # CPU overhead on what can be a long session list.
+        return [SessionSchema.model_construct(**_serialize_row(row)) for row in rows]
     except Exception:
         logger.exception("Failed to fetch sessions")
         raise HTTPException(500, "Failed to retrieve sessions")
@@ -89,18 +162,15 @@ async def get_sessions(
 async def delete_session(
     session_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user),
-    supabase: Client = Depends(get_authenticated_client),
 ):
     user_id = extract_user_id(current_user)
-    res = await supabase_exec(
-        lambda: supabase.table("chat_sessions")
-        .delete()
-        .eq("id", session_id)
-        .eq("user_id", user_id)
-        .execute()
+    row = await db.fetch_one(
+        "DELETE FROM chat_sessions WHERE id = $1 AND user_id = $2 RETURNING id",
+        session_id, user_id,
     )
-    if not res.data:
+    if not row:
         raise HTTPException(404, "Session not found")
+    _SESSION_OWNER_CACHE.pop(session_id, None)
 
 
 @router.patch("/sessions/{session_id}", response_model=SessionSchema)
@@ -108,38 +178,71 @@ async def rename_session(
     session_id: str,
     payload: SessionUpdate,
     current_user: Dict[str, Any] = Depends(get_current_user),
-    supabase: Client = Depends(get_authenticated_client),
 ):
     user_id = extract_user_id(current_user)
-    res = await supabase_exec(
-        lambda: supabase.table("chat_sessions")
-        .update({"topic": payload.topic})
-        .eq("id", session_id)
-        .eq("user_id", user_id)
-        .execute()
-    )
-    if not res.data:
+    row = await db.fetch_one("""
+        UPDATE chat_sessions
+        SET topic = $3
+        WHERE id = $1 AND user_id = $2
+        RETURNING id, topic, created_at
+    """, session_id, user_id, payload.topic)
+    if not row:
         raise HTTPException(404, "Session not found")
-    return res.data[0]
+    return _serialize_row(row)
 
 
-@router.get("/{session_id}/messages", response_model=List[MessageSchema])
+def _stream_json_array(items: List[Dict[str, Any]]):
+    """
+    Yields a JSON array one element at a time so long message lists are
+    never duplicated into a single body buffer: peak extra memory is one
+    serialized row, and the first byte goes out before the last row is
+    encoded.
+    """
+    yield b"["
+    first = True
+    for item in items:
+        if first:
+            first = False
+        else:
+            yield b","
+        yield orjson.dumps(item)
+    yield b"]"
+
+
+# Streamed + response_model=None: rows are already response-shaped, so
+# skip the per-row Pydantic build and serialize row-by-row on the way out.
+@router.get("/{session_id}/messages", response_model=None)
 async def get_session_messages(
     session_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user),
-    supabase: Client = Depends(get_authenticated_client),
-):
+) -> List[MessageSchema]:
     user_id = extract_user_id(current_user)
     try:
-        res = await supabase_exec(
-            lambda: supabase.table("chat_messages")
-            .select("role, content, created_at")
-            .eq("session_id", session_id)
-            .eq("user_id", user_id)
-            .order("created_at")
-            .execute()
+        rows = await db.fetch_all("""
+            SELECT role, content, created_at
+            FROM chat_messages
+            WHERE session_id = $1 AND user_id = $2
+            ORDER BY created_at
+        """, session_id, user_id)
+        messages = [dict(row) for row in rows]
+
+        # Legacy rows store Fernet tokens in 'content'. Bulk-decrypt them
+        # with a single threadpool hop (crypto.decrypt_many reuses the
+        # cached cipher suite); plaintext rows skip the hop entirely.
+        encrypted = [
+            m for m in messages
+            if isinstance(m.get("content"), str) and m["content"].startswith("gAAAAA")
+        ]
+        if encrypted:
+            decrypted = await asyncio.to_thread(
+                crypto.decrypt_many, [m["content"] for m in encrypted]
+            )
+            for m, plain in zip(encrypted, decrypted):
+                m["content"] = plain
+
+        return StreamingResponse(
+            _stream_json_array(messages), media_type="application/json"
         )
-        return res.data or []
     except Exception:
         logger.exception("Failed to load messages")
         raise HTTPException(500, "Failed to load messages")
@@ -161,25 +264,29 @@ async def upload_chat_file(
     """
     limits = QuotaManager.limits(QuotaManager._plan(current_user))
     limit = limits.get("monthly_csv_imports")
-    
+
     if limit is not None:
         used = current_user.get("monthly_import_count", 0)
         if used >= limit:
              raise HTTPException(
-                 status_code=status.HTTP_429_TOO_MANY_REQUESTS, 
+                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                  detail="Monthly CSV import limit reached."
              )
 
     if not file.filename.endswith(".csv"):
         raise HTTPException(400, "Only CSV files are supported")
-    
+
+    # Sanitize once up front: strip any directory components and odd
+    # characters so the storage path can't be steered by the client.
+    secure_name = re.sub(r"[^A-Za-z0-9._-]", "_", os.path.basename(file.filename))
+
     try:
         content = await file.read()
-        
+
         analysis = csv_parser.analyze_structure(content)
         mapping = csv_parser._heuristic_mapping(analysis["headers"], analysis["sample"])
-        
-        temp_path = f"temp/{uuid.uuid4()}/{file.filename}"
+
+        temp_path = f"temp/{uuid.uuid4()}/{secure_name}"
 
         return {
             "status": "success",
@@ -191,7 +298,7 @@ async def upload_chat_file(
             "message": "File analyzed. Please confirm column mapping."
         }
     except Exception as e:
-        logger.error(f"File upload analysis failed: {e}")
+        logger.error("File upload analysis failed: %s", e)
         raise HTTPException(500, "Failed to analyze file")
 
 
@@ -199,15 +306,14 @@ async def upload_chat_file(
 async def confirm_import(
     payload: ImportConfirmSchema,
     current_user: Dict[str, Any] = Depends(get_current_user),
-    supabase: Client = Depends(get_authenticated_client),
 ):
     """
     Placeholder: Actually processes the CSV and inserts trades.
     """
     user_id = extract_user_id(current_user)
-    
+
     # 1. Download file, 2. Parse, 3. Insert trades
-    
+
     await QuotaManager.increment_csv_import(user_id)
 
     return {"status": "success", "count": 0}
@@ -216,89 +322,108 @@ async def confirm_import(
 # ---------------------------------------------------------------------
 # 3. Main Chat Endpoint
 # ---------------------------------------------------------------------
+async def _resolve_session_and_history(
+    user_id: str,
+    raw_message: str,
+    session_id: Optional[str],
+):
+    """
+    Session + history resolution shared by the JSON and SSE endpoints.
+
+    A brand-new session has no history and no DB work before the AI call
+    at all: the id is generated here and the row is created in the
+    background, batched with the message writes. Existing sessions pay
+    one round-trip for history.
+    """
+    history: List[Dict[str, str]] = []
+    new_session_topic: Optional[str] = None
+    if not session_id:
+        new_session_topic = raw_message[:40] + ("..." if len(raw_message) > 40 else "")
+        session_id = str(uuid.uuid4())
+        _SESSION_OWNER_CACHE[session_id] = user_id
+    else:
+        # Fail fast if we already know this session belongs to someone
+        # else — don't burn an LLM call on a doomed request.
+        cached_owner = _SESSION_OWNER_CACHE.get(session_id)
+        if cached_owner is not None and cached_owner != user_id:
+            raise HTTPException(status_code=403, detail="Session access denied")
+        # Scoped by user_id so a foreign session_id yields nothing —
+        # ownership is enforced by the query itself.
+        try:
+            rows = await db.fetch_all("""
+                SELECT role, content
+                FROM chat_messages
+                WHERE session_id = $1 AND user_id = $2
+                ORDER BY created_at DESC
+                LIMIT 4
+            """, session_id, user_id)
+            history = [dict(row) for row in reversed(rows)]
+        except Exception:
+            history = []
+    return session_id, history, new_session_topic
+
+
+
 @router.post("", response_model=ChatResponse)
 @limiter.limit("10/minute") # ✅ AI Protection: Rate Limit added
 async def chat(
     request: Request, # ✅ Required for slowapi (IP extraction)
     chat_req: ChatRequest, # ✅ Renamed from 'request' to avoid collision
+    background_tasks: BackgroundTasks,
     current_user: Dict[str, Any] = Depends(get_current_user),
-    supabase: Client = Depends(get_authenticated_client),
 ):
     user_id = extract_user_id(current_user)
-    
+
     # 1. Validate Access (In-Memory Check)
     QuotaManager.validate_chat_access(current_user)
-    
+
     # ✅ Updated variable reference from 'request' to 'chat_req'
     raw_message = (chat_req.message or "").strip()
     if not raw_message:
         raise HTTPException(400, "Message cannot be empty")
 
     message = sanitizer.sanitize(raw_message)
-    session_id = chat_req.session_id
 
-    # A. Create session if needed
-    if not session_id:
-        topic = raw_message[:40] + ("..." if len(raw_message) > 40 else "")
-        try:
-            res = await supabase_exec(
-                lambda: supabase.table("chat_sessions")
-                .insert({"user_id": user_id, "topic": topic})
-                .execute()
-            )
-            if not res.data:
-                raise Exception("No data returned")
-            session_id = str(res.data[0]["id"])
-        except Exception as e:
-            logger.error(f"Failed to create session: {e}")
-            raise HTTPException(500, "Failed to create chat session")
-
-    # B. Load History (last 4 messages)
-    try:
-        hist = await supabase_exec(
-            lambda: supabase.table("chat_messages")
-            .select("role, content")
-            .eq("session_id", session_id)
-            .order("created_at", desc=True)
-            .limit(4)
-            .execute()
-        )
-        history = list(reversed(hist.data or []))
-    except Exception:
-        history = []
-
-    # C. Store User Message (Plaintext)
-    await supabase_exec(
-        lambda: supabase.table("chat_messages").insert({
-            "session_id": session_id,
-            "user_id": user_id,
-            "role": "user",
-            "content": message,
-        }).execute()
+    # A/B. Session + History
+    session_id, history, new_session_topic = await _resolve_session_and_history(
+        user_id, raw_message, chat_req.session_id
     )
 
-    # D. Process AI Response
-    try:
-        # Pass 'current_user' (profile dict) to pipeline for token management
-        response_text = await ChatPipeline.process(current_user, message, history)
-    except Exception:
-        logger.exception("Chat pipeline failure")
-        response_text = "I encountered an error processing your request. Please try again."
+    # C. Process AI Response (cache first — a hit skips the LLM entirely)
+    cache_key = _chat_cache_key(user_id, message, history)
+    response_text = _CHAT_RESPONSE_CACHE.get(cache_key)
+    if response_text is None:
+        try:
+            # Pass 'current_user' (profile dict) to pipeline for token management
+            response_text = await ChatPipeline.process(current_user, message, history)
+            _CHAT_RESPONSE_CACHE[cache_key] = response_text
+        except Exception:
+            logger.exception("Chat pipeline failure")
+            # Never cache the failure fallback — the next attempt should
+            # hit the pipeline again.
+            response_text = _CHAT_ERROR_TEXT
 
     sanitized_response = sanitizer.sanitize(response_text)
 
-    # E. Store Assistant Response (Plaintext)
-    await supabase_exec(
-        lambda: supabase.table("chat_messages").insert({
-            "session_id": session_id,
-            "user_id": user_id,
-            "role": "assistant",
-            "content": sanitized_response,
-        }).execute()
-    )
-
-    # F. Usage Tracking (Async)
-    asyncio.create_task(QuotaManager.increment_daily_chat(user_id))
+    # D/E. Persist Both Messages + Usage Tracking
+    # When ownership is already proven (new session, or owner cache hit)
+    # the append_chat_turn round-trip is deferred to a background task so
+    # user-visible latency is LLM time only. Only an unproven session_id
+    # keeps the synchronous ownership-guarded write — that branch must be
+    # able to answer 403 before the client sees a response.
+    if new_session_topic is not None or _SESSION_OWNER_CACHE.get(session_id) == user_id:
+        background_tasks.add_task(
+            _persist_chat_turn,
+            user_id, session_id, message, sanitized_response, new_session_topic,
+        )
+    else:
+        stored = await QuotaManager.append_chat_turn(
+            user_id, session_id, message, sanitized_response, verify_ownership=True,
+        )
+        # Nothing written means the supplied session_id belongs to someone else.
+        if not stored:
+            raise HTTPException(status_code=403, detail="Session access denied")
+        _SESSION_OWNER_CACHE[session_id] = user_id
 
     est_tokens = max(1, int((len(message) + len(response_text)) / 4))
 
@@ -306,4 +431,89 @@ async def chat(
         "response": response_text,
         "session_id": session_id,
         "usage": ChatUsage(total_tokens=est_tokens, prompt_tokens=0, completion_tokens=0),
-    }
\ No newline at end of file
+    }
+
+
+@router.post("/stream")
+@limiter.limit("10/minute") # ✅ AI Protection: same budget as the JSON endpoint
+async def chat_stream(
+    request: Request, # ✅ Required for slowapi (IP extraction)
+    chat_req: ChatRequest,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    """
+    SSE variant of the chat endpoint: synthesis tokens are flushed to the
+    client as the provider emits them, so first output arrives in the
+    provider's TTFT instead of after the full 3-8s completion. Events are
+    'data: {"delta": ...}' chunks followed by a final
+    'data: {"done": true, "session_id": ...}'.
+    """
+    user_id = extract_user_id(current_user)
+    QuotaManager.validate_chat_access(current_user)
+
+    raw_message = (chat_req.message or "").strip()
+    if not raw_message:
+        raise HTTPException(400, "Message cannot be empty")
+
+    message = sanitizer.sanitize(raw_message)
+    session_id, history, new_session_topic = await _resolve_session_and_history(
+        user_id, raw_message, chat_req.session_id
+    )
+
+    # A stream can't answer 403 after the first byte, so unproven
+    # sessions are verified up front (the JSON endpoint defers this to
+    # the guarded write instead).
+    if new_session_topic is None and _SESSION_OWNER_CACHE.get(session_id) != user_id:
+        owned = await db.fetch_val(
+            "SELECT 1 FROM chat_sessions WHERE id = $1 AND user_id = $2",
+            session_id, user_id,
+        )
+        if not owned:
+            raise HTTPException(status_code=403, detail="Session access denied")
+        _SESSION_OWNER_CACHE[session_id] = user_id
+
+    cache_key = _chat_cache_key(user_id, message, history)
+
+    async def event_gen():
+        parts: List[str] = []
+        cached = _CHAT_RESPONSE_CACHE.get(cache_key)
+        completed = False
+        try:
+            if cached is not None:
+                # Cache hit: one delta carrying the whole answer.
+                parts.append(cached)
+                yield b'data: ' + orjson.dumps({"delta": cached}) + b"\n\n"
+            else:
+                async for delta in ChatPipeline.process_stream(current_user, message, history):
+                    parts.append(delta)
+                    yield b'data: ' + orjson.dumps({"delta": delta}) + b"\n\n"
+            completed = True
+        except Exception:
+            logger.exception("Chat stream failure")
+            yield b'data: ' + orjson.dumps({"error": _CHAT_ERROR_TEXT}) + b"\n\n"
+
+        # Only a stream that finished cleanly gets cached or persisted:
+        # a mid-stream failure leaves a truncated answer in parts, and
+        # caching it would serve the fragment to every matching prompt
+        # for the TTL (the JSON endpoint never caches its error path
+        # either).
+        response_text = "".join(parts)
+        if completed and response_text:
+            if cached is None:
+                _CHAT_RESPONSE_CACHE[cache_key] = response_text
+            # Ownership was proven before the stream started, so the
+            # persistence helper's unguarded path is safe here. Running
+            # after the last delta, it never delays visible output.
+            await _persist_chat_turn(
+                user_id, session_id, message,
+                sanitizer.sanitize(response_text), new_session_topic,
+            )
+        yield b'data: ' + orjson.dumps({"done": True, "session_id": session_id}) + b"\n\n"
+
+    return StreamingResponse(
+        event_gen(),
+        media_type="text/event-stream",
+        # no-cache + X-Accel-Buffering keep proxies from buffering the
+        # stream back into one big response.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,6 +1,7 @@
 # backend/app/apis/v1/chat/services.py
 import json
 import logging
+import re
 from typing import List, Dict, Any, Optional
 from supabase import Client
 from app.lib.llm_client import llm_client
@@ -29,10 +30,19 @@ async def generate_session_title(session_id: str, first_message: str, supabase:
         if title:
             # Update title
             supabase.table("chat_sessions").update({"topic": title}).eq("id", session_id).execute()
-            logger.debug(f"Generated title for session {session_id}: {title}")
+            logger.debug("Generated title for session %s: %s", session_id, title)
             
     except Exception as e:
-        logger.error(f"Title generation failed for session {session_id}: {e}")
+        logger.error("Title generation failed for session %s: %s", session_id, e)
+
+# Compiled once: the heuristic gate runs per message, so one alternation
+# scan beats a Python loop of substring checks.
+_TRADE_KEYWORDS_RE = re.compile(
+    "|".join(map(re.escape, (
+        "log", "add", "record", "bought", "sold", "shorted", "long", "short", "buy", "sell"
+    )))
+)
+
 
 async def parse_trade_intent(message: str) -> Optional[Dict[str, Any]]:
     """
@@ -40,8 +50,7 @@ async def parse_trade_intent(message: str) -> Optional[Dict[str, Any]]:
     Uses strict JSON mode enforcement.
     """
     # 1. Heuristic Check (Fast fail to save API calls)
-    keywords = ["log", "add", "record", "bought", "sold", "shorted", "long", "short", "buy", "sell"]
-    if not any(k in message.lower() for k in keywords):
+    if not _TRADE_KEYWORDS_RE.search(message.lower()):
         return None
         
     logger.info("Analyzing message for trade intent...")
@@ -97,14 +106,14 @@ async def parse_trade_intent(message: str) -> Optional[Dict[str, Any]]:
         data["symbol"] = data["symbol"].upper()
         data["direction"] = data["direction"].title()
         
-        logger.info(f"Trade details extracted: {data['symbol']} {data['direction']}")
+        logger.info("Trade details extracted: %s %s", data["symbol"], data["direction"])
         return data
         
     except json.JSONDecodeError:
         logger.error("LLM returned invalid JSON for trade parsing")
         return None
     except Exception as e:
-        logger.error(f"Trade parsing failed: {e}")
+        logger.error("Trade parsing failed: %s", e)
         return None
     
 async def parse_news_intent(message: str) -> Optional[str]:
@@ -151,12 +160,12 @@ async def parse_news_intent(message: str) -> Optional[str]:
         query = data.get("search_query")
         
         if query:
-            logger.info(f"🔀 Routing to Perplexity: {query}")
+            logger.info("🔀 Routing to Perplexity: %s", query)
             return query
             
         return None
     except Exception as e:
-        logger.warning(f"News intent detection failed: {e}")
+        logger.warning("News intent detection failed: %s", e)
         return None
     
 
@@ -176,7 +185,7 @@ def build_memory_context(session_id: str, supabase: Client, limit: int = 10) ->
         history = [{"role": m["role"], "content": m["encrypted_content"]} for m in reversed(res.data)]
         return history
     except Exception as e:
-        logger.error(f"Failed to build memory context: {e}")
+        logger.error("Failed to build memory context: %s", e)
         return []
 
 def build_trading_context(supabase: Client) -> str:
@@ -219,5 +228,5 @@ def build_trading_context(supabase: Client) -> str:
         return "\n".join(context_parts)
         
     except Exception as e:
-        logger.error(f"Failed to build trading context: {e}")
+        logger.error("Failed to build trading context: %s", e)
         return "Context unavailable due to system error."
\ No newline at end of file
@@ -100,8 +100,8 @@ async def search_news(
             )
 
     except httpx.HTTPStatusError as e:
-        logger.error(f"Perplexity API Error: {e.response.text}")
+        logger.error("Perplexity API Error: %s", e.response.text)
         raise HTTPException(status_code=e.response.status_code, detail="Failed to fetch news")
     except Exception as e:
-        logger.error(f"News search error: {e}")
+        logger.error("News search error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,12 +1,14 @@
 # backend/app/apis/v1/strategies.py
 
+import hashlib
 import logging
 import json
 import uuid
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request # ✅ Added Request
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response # ✅ Added Request
 
 from app.core.config import settings
 from app.core.database import db
@@ -69,20 +71,35 @@ def _serialize_row(row: Any) -> Dict[str, Any]:
 # Endpoints
 # ---------------------------------------------------------------------
 
-@router.get("/", response_model=List[StrategyResponse])
+# Cache headers let warm clients (dashboard auto-refresh) reuse or
+# revalidate instead of re-downloading an unchanged strategy list.
+_LIST_CACHE_CONTROL = "private, max-age=30, stale-while-revalidate=60"
+
+
+@router.get("/", response_model=None)
 async def get_strategies(
+    request: Request,
     current_user: Dict[str, Any] = Depends(get_current_user),
-):
+) -> List[StrategyResponse]:
     user_id = _get_user_id(current_user)
-    
+
     query = """
-        SELECT * FROM strategies 
-        WHERE user_id = $1 
+        SELECT * FROM strategies
+        WHERE user_id = $1
         ORDER BY created_at DESC
     """
     rows = await db.fetch_all(query, user_id)
-    
-    return [_serialize_row(row) for row in rows]
+
+    # Weak ETag over the serialized rowset: a matching If-None-Match means
+    # the client's copy is current, so answer 304 with no body at all.
+    body = orjson.dumps([_serialize_row(row) for row in rows])
+    etag = f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+    headers = {"ETag": etag, "Cache-Control": _LIST_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/{strategy_id}", response_model=StrategyResponse)
@@ -116,11 +133,9 @@ async def create_strategy(
 
     # 2. Prepare Data
     data = strategy.model_dump()
-    
-    # Serialize rules to JSON string for jsonb column
-    rules_json = json.dumps(data.get("rules", {}))
-    
-    # Note: 'instrument_types' is passed as a list; asyncpg handles TEXT[] conversion automatically.
+
+    # Note: 'instrument_types' is passed as a list; asyncpg handles TEXT[] conversion
+    # automatically. 'rules' binds as a dict via the pool's jsonb codec.
     
     query = """
         INSERT INTO strategies (
@@ -142,11 +157,11 @@ async def create_strategy(
             data.get("color_hex", "#FFFFFF"),
             data.get("style"),
             data.get("instrument_types", []),
-            rules_json,
+            data.get("rules", {}),
             data.get("track_missed_trades", False)
         )
     except Exception as e:
-        logger.error(f"Strategy creation failed: {e}")
+        logger.error("Strategy creation failed: %s", e)
         raise HTTPException(status_code=500, detail="Failed to create strategy")
 
     return _serialize_row(row)
@@ -175,7 +190,7 @@ async def update_strategy(
     for key, val in update_data.items():
         if key == "rules":
             set_clauses.append(f"{key} = ${idx}::jsonb")
-            values.append(json.dumps(val))
+            values.append(val)
         else:
             set_clauses.append(f"{key} = ${idx}")
             values.append(val)
@@ -5,7 +5,7 @@ import json
 import asyncio
 from uuid import uuid4
 from datetime import datetime
-from typing import List, Dict, Any, AsyncGenerator
+from typing import List, Dict, Any, AsyncGenerator, Optional
 
 from fastapi import (
     APIRouter,
@@ -18,6 +18,7 @@ from fastapi import (
 )
 from fastapi.responses import StreamingResponse
 from starlette.concurrency import run_in_threadpool
+import httpx
 from supabase import create_client, Client
 
 from app.core.config import settings
@@ -29,21 +30,41 @@ from app.lib.encryption import crypto
 from app.core.limiter import limiter  # ✅ Rate Limiter Import
 
 # Import schemas
+from pydantic import TypeAdapter
+
 from app.schemas.trade_schemas import (
     TradeCreate,
     TradeUpdate,
     TradeResponse,
 )
 
+# Validates the whole list in one compiled-core pass instead of FastAPI
+# re-entering Python-level validation once per row.
+_TRADE_LIST_ADAPTER = TypeAdapter(List[TradeResponse])
+
 logger = logging.getLogger("tradeomen.trades")
 router = APIRouter()
 
 # Initialize Supabase
 supabase_storage: Client = create_client(
-    settings.SUPABASE_URL, 
+    settings.SUPABASE_URL,
     settings.SUPABASE_SERVICE_ROLE_KEY
 )
 
+# Pooled async client for streaming uploads straight to Storage's REST API.
+# The sync supabase client needs the full body in memory; this one forwards
+# chunks as they arrive off the wire.
+_storage_http = httpx.AsyncClient(
+    base_url=f"{settings.SUPABASE_URL}/storage/v1",
+    headers={"Authorization": f"Bearer {settings.SUPABASE_SERVICE_ROLE_KEY}"},
+    http2=True,
+    timeout=httpx.Timeout(30.0, connect=2.0),
+    limits=httpx.Limits(max_keepalive_connections=10, max_connections=50),
+)
+
+# 1 MiB per chunk: keeps memory O(chunk) no matter how large the upload is.
+_UPLOAD_CHUNK_SIZE = 1 << 20
+
 
 # ---------------------------------------------------------------------
 # Services (Separation of Concerns & Helper Logic)
@@ -108,16 +129,19 @@ class TradeService:
         return user["user_id"]
 
 
+# Module-level tuple: str.endswith accepts a tuple and checks all
+# suffixes in one C call, and the constant isn't rebuilt per upload.
+_ALLOWED_IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+
+
 class ScreenshotService:
     @staticmethod
     def is_safe_file(file: UploadFile) -> bool:
         if file.content_type not in settings.ALLOWED_IMAGE_TYPES:
             return False
-        
+
         # Robust extension check
-        filename = file.filename.lower()
-        allowed_exts = {".png", ".jpg", ".jpeg", ".webp"}
-        return any(filename.endswith(ext) for ext in allowed_exts)
+        return file.filename.lower().endswith(_ALLOWED_IMAGE_EXTS)
 
     @staticmethod
     async def sign_urls_async(paths: List[str]) -> List[Dict[str, str]]:
@@ -131,26 +155,58 @@ class ScreenshotService:
 
         bucket = getattr(settings, "SCREENSHOT_BUCKET", "trade_screenshots")
 
-        def _sign(p: str):
+        # Batch-decrypt all Fernet tokens in ONE threadpool hop instead of
+        # paying per-path cipher setup inside each signing task. decrypt_many
+        # reuses the cached cipher suite across the whole batch.
+        real_paths = list(paths)
+        enc_idx = [i for i, p in enumerate(paths) if p.startswith("gAAAA")]
+        if enc_idx:
+            try:
+                decrypted = await asyncio.to_thread(
+                    crypto.decrypt_many, [paths[i] for i in enc_idx]
+                )
+                for i, plain in zip(enc_idx, decrypted):
+                    real_paths[i] = plain
+            except Exception as e:
+                logger.error("Batch path decryption failed: %s", e)
+
+        def _sign(p: str, real_path: str):
             try:
-                # Fernet tokens start with gAAAA; decrypt if needed
-                real_path = crypto.decrypt(p) if p.startswith("gAAAA") else p
-                
                 res = supabase_storage.storage.from_(bucket).create_signed_url(real_path, 3600)
-                
+
                 # Handle Supabase client response variations
                 url = res.get("signedURL") if isinstance(res, dict) else getattr(res, "signed_url", "")
-                
+
                 # Return the original (encrypted) path so frontend keeps the reference
                 return {"path": p, "url": url}
             except Exception as e:
-                logger.error(f"Signing failed for {p}: {e}")
+                logger.error("Signing failed for %s: %s", p, e)
                 return {"path": p, "url": ""}
 
         # Run in threadpool to prevent blocking async loop with synchronous Supabase calls
-        tasks = [run_in_threadpool(_sign, path) for path in paths]
+        tasks = [run_in_threadpool(_sign, p, rp) for p, rp in zip(paths, real_paths)]
         return await asyncio.gather(*tasks)
 
+    @staticmethod
+    async def stream_upload(bucket: str, path: str, file: UploadFile) -> None:
+        """
+        Streams an UploadFile to Supabase Storage in 1 MiB chunks.
+
+        Unlike the sync client (which needs file.read() to buffer the whole
+        body first), this forwards chunks to the Storage REST endpoint as
+        they arrive, so upload overlaps client I/O and memory stays constant.
+        """
+        async def _chunks() -> AsyncGenerator[bytes, None]:
+            while chunk := await file.read(_UPLOAD_CHUNK_SIZE):
+                yield chunk
+
+        res = await _storage_http.post(
+            f"/object/{bucket}/{path}",
+            headers={"Content-Type": file.content_type or "application/octet-stream"},
+            content=_chunks(),
+        )
+        res.raise_for_status()
+
 
 # ---------------------------------------------------------------------
 # Endpoints
@@ -182,11 +238,17 @@ async def create_trade(
     # 3. Notes: Store as PLAIN TEXT (Sanitized only)
     notes = sanitizer.sanitize(trade.notes) if trade.notes else None
     
-    # 4. Screenshots: Encrypt path strings
-    screenshots_data = [
-        s if s.startswith("gAAAA") else crypto.encrypt(s) 
-        for s in (trade.screenshots or [])
-    ]
+    # 4. Screenshots: Encrypt path strings (off the event loop — Fernet
+    # encryption is sync CPU work, so run the batch in one thread hop)
+    if trade.screenshots:
+        screenshots_data = await asyncio.to_thread(
+            lambda: [
+                s if s.startswith("gAAAA") else crypto.encrypt(s)
+                for s in trade.screenshots
+            ]
+        )
+    else:
+        screenshots_data = []
     
     # 5. PnL Calculation
     pnl = trade.pnl
@@ -218,15 +280,150 @@ async def create_trade(
             user_id, trade.symbol, trade.instrument_type, trade.direction, trade.status,
             trade.entry_price, trade.quantity, trade.entry_time, trade.exit_price, trade.exit_time,
             trade.stop_loss, trade.target, trade.fees, pnl,
-            notes, trade.tags, json.dumps(screenshots_data), trade.strategy_id, json.dumps(trade.metadata or {})
+            notes, trade.tags, json.dumps(screenshots_data), trade.strategy_id, trade.metadata or {}
         )
     except Exception as e:
-        logger.error(f"Trade creation failed: {e}")
+        logger.error("Trade creation failed: %s", e)
         raise HTTPException(status_code=500, detail="Failed to save trade")
 
     return TradeService.serialize_row(row)
 
 
+# Multi-row VALUES insert: 1000 rows per statement keeps each query under
+# sensible parameter/packet limits while amortizing parse/plan/index cost.
+_BULK_INSERT_CHUNK = 1000
+
+_TRADE_INSERT_COLUMNS = """
+    user_id, symbol, instrument_type, direction, status,
+    entry_price, quantity, entry_time, exit_price, exit_time,
+    stop_loss, target, fees, pnl,
+    encrypted_notes, tags, encrypted_screenshots, strategy_id, metadata
+"""
+
+
+@router.post("/batch", response_model=None, status_code=201)
+@limiter.limit("5/minute") # ✅ Rate Limit: Heavy Write Operation
+async def create_trades_bulk(
+    request: Request, # ✅ Required for slowapi
+    trades: List[TradeCreate],
+    current_user: Dict[str, Any] = Depends(get_current_user),
+) -> List[TradeResponse]:
+    """
+    Create many trades in one request. N rows cost one transaction and
+    one multi-row INSERT per 1000 rows, instead of N HTTP round-trips.
+    """
+    if not trades:
+        raise HTTPException(400, "No trades provided")
+
+    user_id = TradeService._get_user_id(current_user)
+
+    # ✅ 1. Enforce Quotas once for the whole batch (Async Check)
+    await QuotaManager.check_trade_limit(current_user, incoming=len(trades))
+
+    # ✅ 2. Feature Flags (Sync Checks - Zero DB)
+    if any(t.screenshots for t in trades):
+        QuotaManager.require_feature(current_user, "allow_screenshots")
+    if any(t.tags for t in trades):
+        QuotaManager.require_feature(current_user, "allow_tags")
+
+    # 3. Encrypt ALL screenshot paths across the batch in one thread hop
+    flat_paths = [s for t in trades for s in (t.screenshots or [])]
+    if flat_paths:
+        encrypted_iter = iter(await asyncio.to_thread(
+            lambda: [
+                s if s.startswith("gAAAA") else crypto.encrypt(s)
+                for s in flat_paths
+            ]
+        ))
+    else:
+        encrypted_iter = iter([])
+
+    # 4. Build row tuples (sanitize notes, compute PnL — same rules as POST /)
+    row_values: List[tuple] = []
+    for trade in trades:
+        notes = sanitizer.sanitize(trade.notes) if trade.notes else None
+        screenshots_data = [next(encrypted_iter) for _ in (trade.screenshots or [])]
+
+        pnl = trade.pnl
+        if pnl is None and trade.exit_price and trade.quantity:
+            multiplier = 1 if trade.direction == "LONG" else -1
+            pnl = ((trade.exit_price - trade.entry_price) * trade.quantity * multiplier) - (trade.fees or 0)
+
+        row_values.append((
+            user_id, trade.symbol, trade.instrument_type, trade.direction, trade.status,
+            trade.entry_price, trade.quantity, trade.entry_time, trade.exit_price, trade.exit_time,
+            trade.stop_loss, trade.target, trade.fees, pnl,
+            notes, trade.tags, json.dumps(screenshots_data), trade.strategy_id,
+            trade.metadata or {},
+        ))
+
+    # 5. Insert chunks inside ONE transaction so a failed chunk rolls back all
+    n_cols = 19
+    inserted: List[Dict[str, Any]] = []
+    try:
+        async with db.transaction() as conn:
+            for start in range(0, len(row_values), _BULK_INSERT_CHUNK):
+                chunk = row_values[start:start + _BULK_INSERT_CHUNK]
+                placeholders = ", ".join(
+                    "(" + ", ".join(
+                        f"${i * n_cols + j + 1}" + ("::jsonb" if j == n_cols - 1 else "")
+                        for j in range(n_cols)
+                    ) + ")"
+                    for i in range(len(chunk))
+                )
+                query = f"""
+                    INSERT INTO trades ({_TRADE_INSERT_COLUMNS})
+                    VALUES {placeholders}
+                    RETURNING *
+                """
+                args = [v for row in chunk for v in row]
+                rows = await conn.fetch(query, *args)
+                inserted.extend(TradeService.serialize_row(r) for r in rows)
+    except Exception as e:
+        logger.error("Bulk trade creation failed: %s", e)
+        raise HTTPException(status_code=500, detail="Failed to save trades")
+
+    return _TRADE_LIST_ADAPTER.validate_python(inserted)
+
+
+# Light projection for the list view: the heavyweight columns
+# (encrypted_notes, encrypted_screenshots, metadata) are only fetched by
+# the per-trade GET, so list bytes stay small no matter the history size.
+_TRADE_LIST_PROJECTION = """
+    id, user_id, symbol, instrument_type, direction, status,
+    entry_price, quantity, entry_time, exit_price, exit_time,
+    stop_loss, target, fees, pnl, tags, strategy_id, created_at
+"""
+
+
+@router.get("/", response_model=None)
+async def list_trades(
+    cursor: Optional[datetime] = None,
+    limit: int = 50,
+    current_user: Dict[str, Any] = Depends(get_current_user),
+):
+    """
+    Keyset-paginated trade list. Pass the last row's entry_time back as
+    `cursor` to fetch the next page; memory and wire bytes stay O(limit).
+    """
+    user_id = TradeService._get_user_id(current_user)
+    limit = max(1, min(limit, 200))
+
+    rows = await db.fetch_all(f"""
+        SELECT {_TRADE_LIST_PROJECTION}
+        FROM trades
+        WHERE user_id = $1
+        AND ($2::timestamptz IS NULL OR entry_time < $2)
+        ORDER BY entry_time DESC
+        LIMIT $3
+    """, user_id, cursor, limit)
+
+    data = [TradeService.serialize_row(row) for row in rows]
+    next_cursor = data[-1]["entry_time"] if len(data) == limit else None
+
+    return {"data": data, "next_cursor": next_cursor, "size": len(data)}
+
+
 @router.get("/{trade_id}", response_model=TradeResponse)
 async def get_trade(
     trade_id: str,
@@ -313,14 +510,16 @@ async def update_trade(
     
     if "screenshots" in update_data:
         raw_list = update_data.pop("screenshots")
-        enc_list = [
-            s if s.startswith("gAAAA") else crypto.encrypt(s) 
-            for s in raw_list
-        ]
+        # Same off-loop batch encryption as create_trade
+        enc_list = await asyncio.to_thread(
+            lambda: [
+                s if s.startswith("gAAAA") else crypto.encrypt(s)
+                for s in raw_list
+            ]
+        )
         update_data["encrypted_screenshots"] = json.dumps(enc_list)
 
-    if "metadata" in update_data:
-        update_data["metadata"] = json.dumps(update_data["metadata"])
+    # 'metadata' binds as a dict via the pool's jsonb codec — no dumps here.
 
     # Dynamic SQL generation using positional args
     set_clauses = []
@@ -441,47 +640,43 @@ async def upload_trade_screenshot(
     # ✅ Feature Flag (Sync Check - Zero DB)
     QuotaManager.require_feature(current_user, "allow_screenshots")
 
-    uploaded_results = []
-    new_paths_encrypted = []
     bucket_name = getattr(settings, "SCREENSHOT_BUCKET", "trade_screenshots")
 
-    for file in files:
-        if not ScreenshotService.is_safe_file(file):
-            continue
-            
-        ext = file.filename.split(".")[-1].lower()
-        filename = f"{uuid4().hex}.{ext}"
-        path = f"{user_id}/{filename}"
-        
-        contents = await file.read()
-        
+    async def _upload_one(file: UploadFile, path: str):
         try:
-            # Upload to storage (Blocking I/O offloaded)
-            await run_in_threadpool(
-                lambda: supabase_storage.storage.from_(bucket_name).upload(
-                    path, contents, {"content-type": file.content_type}
-                )
-            )
-            
+            # Upload to storage (streamed — no full-body buffering)
+            await ScreenshotService.stream_upload(bucket_name, path, file)
+
             # Encrypt path immediately (Fernet gAAAA...)
             enc_path = crypto.encrypt(path)
-            new_paths_encrypted.append(enc_path)
-            
+
             # Generate signed URL
             signed_url_res = await run_in_threadpool(
                 lambda: supabase_storage.storage.from_(bucket_name).create_signed_url(path, 3600)
             )
-            
+
             url = signed_url_res.get("signedURL") if isinstance(signed_url_res, dict) else getattr(signed_url_res, "signed_url", "")
-            
-            uploaded_results.append({
-                "filename": file.filename, 
+
+            return {
+                "filename": file.filename,
                 "path": enc_path,
                 "url": url
-            })
-            
+            }
         except Exception as e:
-            logger.error(f"Upload failed: {e}")
+            logger.error("Upload failed: %s", e)
+            return None
+
+    # Fan out: each file still does upload -> sign sequentially (the URL
+    # needs the object to exist), but files no longer wait on each other,
+    # so a 4-file upload pays ~2 RTTs instead of 8.
+    safe_files = [f for f in files if ScreenshotService.is_safe_file(f)]
+    results = await asyncio.gather(*[
+        _upload_one(f, f"{user_id}/{uuid4().hex}.{f.filename.split('.')[-1].lower()}")
+        for f in safe_files
+    ])
+
+    uploaded_results = [r for r in results if r]
+    new_paths_encrypted = [r["path"] for r in uploaded_results]
 
     if not uploaded_results:
         raise HTTPException(400, "No valid files uploaded")
@@ -494,8 +689,9 @@ async def upload_trade_screenshot(
         try:
             # Atomic Append using Postgres JSONB operator (||)
             # ✅ FIX: Explicit cast from TEXT -> JSONB, concat, then cast back to TEXT
-            new_json_fragment = json.dumps(new_paths_encrypted)
-            
+            # The list binds as jsonb via the pool's orjson codec.
+            new_json_fragment = new_paths_encrypted
+
             update_query = """
                 UPDATE trades 
                 SET encrypted_screenshots = 
@@ -507,7 +703,7 @@ async def upload_trade_screenshot(
             uploaded_to_trade = True
             
         except Exception as e:
-            logger.error(f"Failed to link screenshots atomically: {e}")
+            logger.error("Failed to link screenshots atomically: %s", e)
 
     return {
         "files": uploaded_results, 
@@ -37,10 +37,22 @@ def invalidate_user_cache(user_id: str) -> None:
     if user_id in _USER_CACHE:
         try:
             del _USER_CACHE[user_id]
-            logger.info(f"[CACHE] 🗑️ Invalidated cache for user {user_id}")
+            logger.info("[CACHE] 🗑️ Invalidated cache for user %s", user_id)
         except KeyError:
             pass # Key might have expired naturally just now
 
+def invalidate_user_cache_many(user_ids) -> None:
+    """
+    Bulk variant for admin flows that touch several users at once.
+    One call, one log line, instead of a per-user loop at the call site.
+    """
+    evicted = 0
+    for user_id in user_ids:
+        if _USER_CACHE.pop(user_id, None) is not None:
+            evicted += 1
+    if evicted:
+        logger.info("[CACHE] 🗑️ Invalidated cache for %d users", evicted)
+
 def update_user_cache(user_id: str, updates: Dict[str, Any]) -> None:
     """
     Updates the in-memory cache with fresh values (Write-Through).
@@ -97,34 +109,36 @@ async def get_current_user(
 
             # [JIT PROVISIONING]
             if not row:
-                logger.info(f"[AUTH DEBUG] User {user_id} not found in DB. Attempting JIT...")
+                logger.info("[AUTH DEBUG] User %s not found in DB. Attempting JIT...", user_id)
                 user_metadata = auth_payload.get("user_metadata", {})
                 full_name = user_metadata.get("full_name", "")
 
+                # Upsert: the no-op DO UPDATE makes RETURNING yield the
+                # row on both the create path and the concurrent-signup
+                # race, so no fallback SELECT round-trip is needed.
                 insert_query = """
                     INSERT INTO public.user_profiles (
                         id, email, full_name, active_plan_id, plan_tier, preferences
                     ) VALUES ($1, $2, $3, 'free', 'FREE', '{}')
-                    ON CONFLICT (id) DO NOTHING
-                    RETURNING id, role, active_plan_id, plan_tier, preferences
+                    ON CONFLICT (id) DO UPDATE SET email = EXCLUDED.email
+                    RETURNING id, role, active_plan_id, daily_chat_count,
+                              last_chat_reset_at, monthly_ai_tokens_used,
+                              monthly_import_count, quota_reset_at, preferences, plan_tier
                 """
                 row = await db.fetch_one(insert_query, user_id, email, full_name)
-                
-                if not row:
-                    row = await db.fetch_one(query, user_id)
 
             if row:
                 user_profile = dict(row)
                 
                 # Update Cache
                 _USER_CACHE[user_id] = user_profile
-                logger.info(f"[AUTH DEBUG] DB Fetch Success. User: {user_id} | Plan: {user_profile.get('plan_tier')}")
+                logger.info("[AUTH DEBUG] DB Fetch Success. User: %s | Plan: %s", user_id, user_profile.get("plan_tier"))
             else:
-                logger.error(f"[AUTH DEBUG] Failed to fetch or create user profile for {user_id}")
+                logger.error("[AUTH DEBUG] Failed to fetch or create user profile for %s", user_id)
                 raise HTTPException(status_code=500, detail="Profile load failed")
 
         except Exception as e:
-            logger.exception(f"[AUTH DEBUG] DB Error for {user_id}: {e}")
+            logger.exception("[AUTH DEBUG] DB Error for %s: %s", user_id, e)
             raise HTTPException(status_code=503, detail="Service unavailable")
 
     # 3. Determine Final Role
@@ -133,7 +147,7 @@ async def get_current_user(
     final_role = db_role or jwt_role
     
     if final_role == "authenticated":
-        logger.warning(f"⚠️ [AUTH WARNING] Role resolved to 'authenticated'. DB Role: {db_role}")
+        logger.warning("⚠️ [AUTH WARNING] Role resolved to 'authenticated'. DB Role: %s", db_role)
 
     return {
         "user_id": user_profile["id"],
@@ -123,6 +123,9 @@ class Settings(BaseSettings):
     # --------------------------------------------------
     SCREENSHOT_BUCKET: str = "trade-screenshots"
     MAX_UPLOAD_SIZE_BYTES: int = 5 * 1024 * 1024
+    # Hard cap enforced at the ASGI layer for ANY request body (covers
+    # multi-file screenshot uploads, hence larger than the per-file cap).
+    MAX_REQUEST_BODY_BYTES: int = 25 * 1024 * 1024
     ALLOWED_IMAGE_TYPES: List[str] = [
         "image/png", "image/jpeg", "image/jpg", "image/webp",
     ]
@@ -207,11 +210,21 @@ class Settings(BaseSettings):
         },
     }
 
+    # Flat precomputed limits per plan (populated lazily). get_plan_limits
+    # is on the hot path of every quota check, so the deepcopy + DEV
+    # inflation only run once per plan key; callers must treat the
+    # returned dict as read-only.
+    _PLAN_LIMITS_CACHE: ClassVar[Dict[str, Dict[str, Any]]] = {}
+
     def get_plan_limits(self, plan_tier: str) -> Dict[str, Any]:
         plan_key = (plan_tier or self.DEFAULT_PLAN).upper()
         if plan_key not in self.PLAN_DEFINITIONS:
             plan_key = self.DEFAULT_PLAN
 
+        cached = self._PLAN_LIMITS_CACHE.get(plan_key)
+        if cached is not None:
+            return cached
+
         limits = deepcopy(self.PLAN_DEFINITIONS[plan_key])
 
         # Inflate limits in DEV only
@@ -224,6 +237,7 @@ class Settings(BaseSettings):
                 }:
                     limits[key] = val * 1000
 
+        self._PLAN_LIMITS_CACHE[plan_key] = limits
         return limits
 
     # --------------------------------------------------
@@ -4,12 +4,28 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 from app.core.config import settings
 
+
+def _rate_key(request) -> str:
+    """
+    Per-request memoized key derivation.
+    get_remote_address walks request.client (and any forwarding headers)
+    each time it's called; stash the result on request.state so stacked
+    limiters — or any future middleware that needs the caller identity —
+    resolve it exactly once per request.
+    """
+    key = getattr(request.state, "rate_key", None)
+    if key is None:
+        key = get_remote_address(request)
+        request.state.rate_key = key
+    return key
+
+
 # Initialize Limiter
 # key_func: Uses IP address. Safe, fast, and handles unauthenticated DDOS too.
 # storage_uri: Defaults to memory://, but switches to Redis if you change .env
 limiter = Limiter(
-    key_func=get_remote_address,
+    key_func=_rate_key,
     storage_uri=settings.RATE_LIMIT_STORAGE_URL,
     strategy="fixed-window", # "fixed-window" is the fastest strategy for in-memory
     enabled=True
-)
\ No newline at end of file
+)
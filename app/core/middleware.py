@@ -2,15 +2,86 @@
 
 import time
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 from fastapi import Request
 from app.services.performance_monitor import PerformanceMonitor
 from app.services.analytics import Analytics # ✅ Added Analytics Import
 
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class MaxBodySizeMiddleware:
+    """
+    Rejects oversized request bodies BEFORE a handler buffers them.
+
+    Declared Content-Length over the cap is refused immediately with 413;
+    chunked/streaming bodies are tallied as they arrive and cut off the
+    moment they cross the cap, so a misbehaving client can never force a
+    worker to hold a multi-GB upload in memory.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        # Fast path: declared length already over the cap
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    if int(value) > self.max_bytes:
+                        return await self._reject(scope, receive, send)
+                except ValueError:
+                    pass
+                break
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise _BodyTooLarge()
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except _BodyTooLarge:
+            if response_started:
+                raise  # too late for a clean 413; let the server abort
+            await self._reject(scope, receive, send)
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send):
+        response = JSONResponse(
+            {"detail": "Request body too large"}, status_code=413
+        )
+        await response(scope, receive, send)
+
 class APIMonitorMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         start_time = time.time()
-        
+
+        # Hoist per-request values: request.url is rebuilt from ASGI scope
+        # on each access, and this middleware runs on every request.
+        method = request.method
+        path = request.url.path
+
         try:
             response = await call_next(request)
             status_code = response.status_code
@@ -30,8 +101,8 @@ class APIMonitorMiddleware(BaseHTTPMiddleware):
             
             # 1. Internal Metrics (Postgres/Performance Monitor)
             await PerformanceMonitor.record_request(
-                method=request.method,
-                path=request.url.path,
+                method=method,
+                path=path,
                 status_code=status_code,
                 duration_ms=duration_ms,
                 user_id=user_id
@@ -40,13 +111,13 @@ class APIMonitorMiddleware(BaseHTTPMiddleware):
             # 2. External Analytics (PostHog)
             # Only capture if we have a user_id to avoid polluting with anonymous noise
             # and only for actual API routes (ignoring docs/health)
-            if user_id and not request.url.path.startswith(("/docs", "/redoc", "/openapi.json")):
+            if user_id and not path.startswith(("/docs", "/redoc", "/openapi.json")):
                 Analytics.capture(
                     user_id=str(user_id),
                     event_name="api_request_processed",
                     properties={
-                        "method": request.method,
-                        "path": request.url.path,
+                        "method": method,
+                        "path": path,
                         "status_code": status_code,
                         "duration_ms": round(duration_ms, 2),
                         "is_error": status_code >= 400
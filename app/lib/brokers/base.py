@@ -1,8 +1,23 @@
 # backend/app/lib/brokers/base.py
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any
 from decimal import Decimal
 
+import httpx
+
+# Shared keepalive transport for ALL broker API calls. Adapters used to
+# open a fresh httpx.AsyncClient per method call, paying TCP+TLS setup
+# on every auth ping and trade fetch; a pooled client reuses warm
+# connections across calls and across sync jobs. Adapters are cheap
+# dict wrappers, so sharing the client (not the adapter) is what
+# amortizes the cost. Closed at app shutdown in main.py, alongside the
+# other pooled clients.
+_broker_http = httpx.AsyncClient(
+    http2=True,
+    timeout=httpx.Timeout(15.0, connect=5.0),
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=60.0),
+)
+
 class BrokerAdapter(ABC):
     """
     Base contract for all broker integrations.
@@ -24,6 +39,12 @@ class BrokerAdapter(ABC):
         }
     """
 
+    # Capability flag: True when authenticate() is a pure credential check
+    # that shares no state with fetch_recent_trades() (e.g. a ping against
+    # a funds endpoint). Sync can then run both calls concurrently and
+    # simply discard the fetched trades if auth comes back False.
+    auth_is_independent: bool = False
+
     def __init__(self, credentials: Dict[str, str]):
         # Contains access_token OR api_key + api_secret
         self.credentials = credentials
@@ -39,6 +60,10 @@ class BrokerAdapter(ABC):
         pass
 
     @abstractmethod
-    def normalize_trades(self, raw_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Normalize raw broker data into canonical TradeOmen trade format."""
+    def normalize_trades(self, raw_data: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily normalize raw broker data into canonical TradeOmen trade
+        format, yielding one trade at a time so callers can batch inserts
+        without holding the normalized set in memory alongside raw_data.
+        """
         pass
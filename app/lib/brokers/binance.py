@@ -2,11 +2,10 @@
 import time
 import hmac
 import hashlib
-import httpx
 from urllib.parse import urlencode
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any
 from datetime import datetime
-from app.lib.brokers.base import BrokerAdapter
+from app.lib.brokers.base import BrokerAdapter, _broker_http
 import logging
 
 logger = logging.getLogger(__name__)
@@ -37,19 +36,18 @@ class BinanceAdapter(BrokerAdapter):
         """
         Checks if API Key is valid by fetching account status.
         """
-        async with httpx.AsyncClient() as client:
-            try:
-                params = self._sign({})
-                headers = {"X-MBX-APIKEY": self.api_key}
-                res = await client.get(
-                    f"{self.BASE_URL}/api/v3/account", 
-                    params=params, 
-                    headers=headers
-                )
-                return res.status_code == 200
-            except Exception as e:
-                logger.error(f"Binance Auth Error: {e}")
-                return False
+        try:
+            params = self._sign({})
+            headers = {"X-MBX-APIKEY": self.api_key}
+            res = await _broker_http.get(
+                f"{self.BASE_URL}/api/v3/account",
+                params=params,
+                headers=headers
+            )
+            return res.status_code == 200
+        except Exception as e:
+            logger.error(f"Binance Auth Error: {e}")
+            return False
 
     async def fetch_recent_trades(self, days: int = 30) -> List[Dict[str, Any]]:
         """
@@ -57,37 +55,35 @@ class BinanceAdapter(BrokerAdapter):
         NOTE: Binance REST API requires specifying a symbol.
         For this MVP, we default to syncing major pairs.
         """
-        async with httpx.AsyncClient() as client:
-            all_trades = []
-            # In a production app, we would fetch user's non-zero balances first to know which symbols to query.
-            # For MVP, we check the most common trading pairs.
-            symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT", "XRPUSDT", "ADAUSDT"]
-            headers = {"X-MBX-APIKEY": self.api_key}
-            
-            for symbol in symbols:
-                try:
-                    # 'limit': 50 trades per symbol
-                    params = self._sign({"symbol": symbol, "limit": 50})
-                    res = await client.get(
-                        f"{self.BASE_URL}/api/v3/myTrades", 
-                        params=params, 
-                        headers=headers
-                    )
-                    if res.status_code == 200:
-                        trades = res.json()
-                        # Ensure symbol context is preserved
-                        for t in trades:
-                            if "symbol" not in t: 
-                                t["symbol"] = symbol
-                        all_trades.extend(trades)
-                except Exception as e:
-                    # Log but continue to next symbol
-                    logger.warning(f"Failed to fetch Binance trades for {symbol}: {e}")
-            
-            return all_trades
+        all_trades = []
+        # In a production app, we would fetch user's non-zero balances first to know which symbols to query.
+        # For MVP, we check the most common trading pairs.
+        symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BNBUSDT", "XRPUSDT", "ADAUSDT"]
+        headers = {"X-MBX-APIKEY": self.api_key}
 
-    def normalize_trades(self, raw_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        normalized = []
+        for symbol in symbols:
+            try:
+                # 'limit': 50 trades per symbol
+                params = self._sign({"symbol": symbol, "limit": 50})
+                res = await _broker_http.get(
+                    f"{self.BASE_URL}/api/v3/myTrades",
+                    params=params,
+                    headers=headers
+                )
+                if res.status_code == 200:
+                    trades = res.json()
+                    # Ensure symbol context is preserved
+                    for t in trades:
+                        if "symbol" not in t:
+                            t["symbol"] = symbol
+                    all_trades.extend(trades)
+            except Exception as e:
+                # Log but continue to next symbol
+                logger.warning(f"Failed to fetch Binance trades for {symbol}: {e}")
+
+        return all_trades
+
+    def normalize_trades(self, raw_data: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
         for t in raw_data:
             try:
                 # Binance 'myTrades' response object:
@@ -119,8 +115,6 @@ class BinanceAdapter(BrokerAdapter):
                     "metadata": t
                 }
                 
-                normalized.append(trade)
+                yield trade
             except Exception as e:
-                logger.warning(f"Skipping malformed Binance trade: {e}")
-                
-        return normalized
\ No newline at end of file
+                logger.warning(f"Skipping malformed Binance trade: {e}")
\ No newline at end of file
@@ -1,15 +1,14 @@
 # backend/app/lib/brokers/dhan.py
 from __future__ import annotations
 
-import httpx
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 from datetime import datetime, timedelta
 from decimal import Decimal, InvalidOperation
 import dateutil.parser
 import uuid
 
-from app.lib.brokers.base import BrokerAdapter
+from app.lib.brokers.base import BrokerAdapter, _broker_http
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -27,6 +26,11 @@ class DhanAdapter(BrokerAdapter):
 
     BASE_URL = "https://api.dhan.co"
 
+    # authenticate() only pings /fund-limits with the same static headers
+    # as the trades fetch — no session or cookie handshake — so the two
+    # calls are safe to run concurrently.
+    auth_is_independent = True
+
     def __init__(self, credentials: Dict[str, str]):
         """
         credentials must contain {"access_token": "<JWT>"} for sync-time usage.
@@ -58,34 +62,33 @@ class DhanAdapter(BrokerAdapter):
             "clientSecret": settings.DHAN_CLIENT_SECRET,
         }
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            try:
-                resp = await client.post(url, json=payload)
-                if resp.status_code != 200:
-                    logger.error("Dhan token exchange failed %s: %s", resp.status_code, resp.text)
-                    return None
-
-                data = resp.json()
-                # The response shape may vary; try a couple common shapes
-                token = data.get("access_token") or (data.get("data") or {}).get("access_token")
-                # Some implementations return expiry seconds or expires_at - handle both
-                expires_in = data.get("expires_in") or (data.get("data") or {}).get("expires_in")
-                expires_at = None
-                if expires_in:
-                    try:
-                        expires_at = (datetime.utcnow() + timedelta(seconds=int(expires_in))).isoformat()
-                    except Exception:
-                        expires_at = None
-
-                if not token:
-                    logger.error("Dhan token exchange returned no access_token: %s", data)
-                    return None
-
-                return {"access_token": token, "expires_at": expires_at}
-            except Exception as e:
-                logger.exception("Exception during Dhan token exchange: %s", e)
+        try:
+            resp = await _broker_http.post(url, json=payload, timeout=timeout)
+            if resp.status_code != 200:
+                logger.error("Dhan token exchange failed %s: %s", resp.status_code, resp.text)
+                return None
+
+            data = resp.json()
+            # The response shape may vary; try a couple common shapes
+            token = data.get("access_token") or (data.get("data") or {}).get("access_token")
+            # Some implementations return expiry seconds or expires_at - handle both
+            expires_in = data.get("expires_in") or (data.get("data") or {}).get("expires_in")
+            expires_at = None
+            if expires_in:
+                try:
+                    expires_at = (datetime.utcnow() + timedelta(seconds=int(expires_in))).isoformat()
+                except Exception:
+                    expires_at = None
+
+            if not token:
+                logger.error("Dhan token exchange returned no access_token: %s", data)
                 return None
 
+            return {"access_token": token, "expires_at": expires_at}
+        except Exception as e:
+            logger.exception("Exception during Dhan token exchange: %s", e)
+            return None
+
     # -------------------------
     # Authentication (validate token)
     # -------------------------
@@ -100,19 +103,18 @@ class DhanAdapter(BrokerAdapter):
             return False
 
         url = f"{self.BASE_URL}/fund-limits"  # not under /v2
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            try:
-                resp = await client.get(url, headers=self.headers)
-                if resp.status_code == 200:
-                    return True
-                if resp.status_code in (401, 403):
-                    logger.info("Dhan token invalid/expired: %s", resp.status_code)
-                    return False
-                logger.error("Dhan authenticate unexpected status %s: %s", resp.status_code, resp.text)
-                return False
-            except Exception as e:
-                logger.exception("Dhan authenticate exception: %s", e)
+        try:
+            resp = await _broker_http.get(url, headers=self.headers, timeout=timeout)
+            if resp.status_code == 200:
+                return True
+            if resp.status_code in (401, 403):
+                logger.info("Dhan token invalid/expired: %s", resp.status_code)
                 return False
+            logger.error("Dhan authenticate unexpected status %s: %s", resp.status_code, resp.text)
+            return False
+        except Exception as e:
+            logger.exception("Dhan authenticate exception: %s", e)
+            return False
 
     # -------------------------
     # Fetch trades
@@ -128,29 +130,28 @@ class DhanAdapter(BrokerAdapter):
 
         url = f"{self.BASE_URL}/v2/trades"
         params = {"days": days} if days else {}
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            try:
-                resp = await client.get(url, headers=self.headers, params=params)
-                if resp.status_code != 200:
-                    logger.error("Dhan trades fetch failed %s: %s", resp.status_code, resp.text)
-                    return []
-                payload = resp.json()
-                # Usually { "status": "success", "data": [...] }
-                return payload.get("data") or payload.get("trades") or []
-            except Exception as e:
-                logger.exception("Dhan fetch_recent_trades exception: %s", e)
+        try:
+            resp = await _broker_http.get(url, headers=self.headers, params=params, timeout=timeout)
+            if resp.status_code != 200:
+                logger.error("Dhan trades fetch failed %s: %s", resp.status_code, resp.text)
                 return []
+            payload = resp.json()
+            # Usually { "status": "success", "data": [...] }
+            return payload.get("data") or payload.get("trades") or []
+        except Exception as e:
+            logger.exception("Dhan fetch_recent_trades exception: %s", e)
+            return []
 
     # -------------------------
     # Normalize trades
     # -------------------------
-    def normalize_trades(self, raw_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def normalize_trades(self, raw_data: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
         """
         Convert Dhan trade objects into canonical TradeOmen format.
         Ensures Decimal types for financials, ISO datetimes, uppercase symbol.
+        Yields trades one at a time so large syncs never hold the whole
+        normalized set in memory alongside raw_data.
         """
-        normalized: List[Dict[str, Any]] = []
-
         def to_decimal(value) -> Decimal:
             try:
                 if value is None:
@@ -193,12 +194,10 @@ class DhanAdapter(BrokerAdapter):
                 }
 
                 if trade["symbol"] and trade["entry_price"] > 0 and trade["quantity"] > 0:
-                    normalized.append(trade)
+                    yield trade
                 else:
                     logger.debug("Skipping Dhan trade missing required fields: %s", t)
 
             except Exception as e:
                 logger.warning("Skipping malformed Dhan trade: %s -- %s", e, t)
                 continue
-
-        return normalized
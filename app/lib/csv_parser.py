@@ -464,79 +464,91 @@ class CSVParser:
                 logger.debug("Mapping for target '%s' referenced unknown header '%s'", tgt, csv_header)
 
         mapped_headers = set(resolved_mapping.values())
-        normalized_rows: List[Dict[str, Any]] = []
         numeric_fields = ["entry_price", "exit_price", "quantity", "fees", "pnl"]
 
-        for idx, row in df.iterrows():
-            trade: Dict[str, Any] = {}
-            metadata: Dict[str, Any] = {}
+        # ------------------------------------------------------------
+        # Vectorized column transforms.
+        #
+        # The old implementation walked df.iterrows() and re-parsed every
+        # cell in Python (pd.to_datetime per value, Decimal per value,
+        # Series construction per row). All whole-column work now happens
+        # once per column in pandas' C paths; the final assembly loop only
+        # shuffles already-normalized values into dicts.
+        # ------------------------------------------------------------
+
+        # Mapped fields, stripped; empty string means "absent"
+        out = pd.DataFrame(index=df.index)
+        for target_field, resolved_header in resolved_mapping.items():
+            out[target_field] = df[resolved_header].astype(str).str.strip()
+
+        # Direction normalization (whole-column)
+        if "direction" in out.columns:
+            d = out["direction"].str.upper()
+            out["direction"] = d.where(~d.isin(DIRECTION_POSITIVE), "LONG") \
+                                .where(~d.isin(DIRECTION_NEGATIVE), "SHORT")
+
+        # Numeric conversions -> Decimal (single pass per column)
+        def _to_decimal(raw: str) -> Optional[Decimal]:
+            raw = raw.replace(",", "").replace("$", "").strip()
+            if raw == "":
+                return None
+            try:
+                return Decimal(raw)
+            except (InvalidOperation, ValueError):
+                return None
+
+        for field in numeric_fields:
+            if field in out.columns:
+                out[field] = out[field].map(_to_decimal)
+
+        # Date normalization -> ISO. format="mixed" parses per element;
+        # the default whole-column path infers one format from the first
+        # row and coerces every row that doesn't match it to NaT,
+        # silently losing dates in mixed-format files.
+        for date_field in ["entry_date", "exit_date"]:
+            if date_field in out.columns:
+                parsed = pd.to_datetime(out[date_field], format="mixed", errors="coerce")
+                # Object dtype keeps None as None: assigning a plain
+                # list lets pandas coerce None to float NaN, which slips
+                # past the `v is not None` filter below and emits
+                # 'exit_date': nan on open trades instead of omitting
+                # the key.
+                out[date_field] = pd.Series(
+                    [None if pd.isna(p) else p.isoformat() for p in parsed],
+                    index=out.index,
+                    dtype=object,
+                )
 
-            # Extract mapped fields using resolved headers
-            for target_field, resolved_header in resolved_mapping.items():
-                if resolved_header not in df.columns:
-                    continue
-                raw_val = row[resolved_header]
-                if raw_val is None or str(raw_val).strip() == "":
-                    continue
-                trade[target_field] = str(raw_val).strip()
+        # Instrument type: explicit column first, then symbol inference
+        raw_instrument = None
+        if "instrument_type" in out.columns:
+            raw_instrument = out["instrument_type"].tolist()
+            out["instrument_type"] = out["instrument_type"].map(normalize_instrument_type)
+
+        # Unmapped columns -> per-row metadata dicts
+        unmapped_cols = [c for c in df.columns if c not in mapped_headers]
+        metadata_records = (
+            df[unmapped_cols].astype(str).to_dict(orient="records")
+            if unmapped_cols else [{} for _ in range(len(df))]
+        )
 
-            # Unmapped columns -> metadata
-            for col in df.columns:
-                if col in mapped_headers:
-                    continue
-                val = row[col]
-                if val is not None and str(val).strip() != "":
-                    metadata[col] = str(val).strip()
-
-            # Direction normalization
-            if "direction" in trade:
-                d = str(trade["direction"]).strip().upper()
-                if d in DIRECTION_POSITIVE:
-                    trade["direction"] = "LONG"
-                elif d in DIRECTION_NEGATIVE:
-                    trade["direction"] = "SHORT"
-                else:
-                    trade["direction"] = trade["direction"].upper()
-
-            # Instrument type normalization
-            normalized_it = None
-            if "instrument_type" in trade:
-                raw_it = trade.get("instrument_type")
-                normalized_it = normalize_instrument_type(raw_it)
-                if metadata is None:
-                    metadata = {}
-                metadata["instrument_type_raw"] = raw_it
-
-            # If no valid instrument type found, try to infer from SYMBOL
-            if not normalized_it and "symbol" in trade:
+        records = out.to_dict(orient="records")
+        normalized_rows: List[Dict[str, Any]] = []
+
+        for idx, (record, meta_raw) in enumerate(zip(records, metadata_records)):
+            trade = {
+                k: v for k, v in record.items()
+                if v is not None and v != "" and k != "instrument_type"
+            }
+            metadata = {k: v.strip() for k, v in meta_raw.items() if v and v.strip()}
+
+            # Instrument type normalization + symbol fallback
+            normalized_it = record.get("instrument_type") or None
+            if raw_instrument is not None and raw_instrument[idx]:
+                metadata["instrument_type_raw"] = raw_instrument[idx]
+            if not normalized_it and trade.get("symbol"):
                 normalized_it = infer_instrument_from_symbol(trade["symbol"], rules=rules)
-            
-            if normalized_it:
-                trade["instrument_type"] = normalized_it
-            else:
-                trade["instrument_type"] = None
-
-            # Numeric conversions -> Decimal
-            for field in numeric_fields:
-                if field in trade:
-                    raw = str(trade[field]).replace(",", "").replace("$", "").strip()
-                    if raw == "":
-                        trade[field] = None
-                    else:
-                        try:
-                            trade[field] = Decimal(raw)
-                        except (InvalidOperation, ValueError):
-                            logger.debug("Numeric parse failed for row %s field %s value=%s", idx, field, raw)
-                            trade[field] = None
-
-            # Date normalization -> ISO
-            for date_field in ["entry_date", "exit_date"]:
-                if date_field in trade:
-                    parsed = pd.to_datetime(trade[date_field], errors="coerce")
-                    if pd.isna(parsed):
-                        trade[date_field] = None
-                    else:
-                        trade[date_field] = parsed.isoformat()
+            trade["instrument_type"] = normalized_it or None
 
             if metadata:
                 trade["_metadata"] = metadata
@@ -1,5 +1,6 @@
 from cryptography.fernet import Fernet, InvalidToken
 import logging
+from typing import List
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -74,6 +75,19 @@ class EncryptionHandler:
             logger.warning(f"Decrypt fallback used due to error: {e}")
             return encrypted_text
 
+    def decrypt_many(self, values: List[str]) -> List[str]:
+        """
+        Bulk decrypt: processes a whole batch with the single cached
+        cipher suite in one call.
+
+        Intended for history/list endpoints — callers can offload the
+        entire batch with one asyncio.to_thread() hop instead of paying a
+        thread dispatch (and a fresh Fernet key schedule) per row.
+        Inherits the tolerant semantics of decrypt(): plaintext and
+        invalid values pass through unchanged.
+        """
+        return [self.decrypt(v) for v in values]
+
 
 # Singleton instance
 crypto = EncryptionHandler()
@@ -5,6 +5,7 @@ import json
 from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 
 import httpx
+import orjson
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
 
 from app.core.config import settings
@@ -47,7 +48,20 @@ def _should_retry(exc: Exception) -> bool:
 class LLMClient:
     def __init__(self):
         timeout = getattr(settings, "LLM_REQUEST_TIMEOUT_SECONDS", 60.0)
-        self.client = httpx.AsyncClient(timeout=timeout, trust_env=True)
+        # Pooled client with keep-alive: avoids re-doing TLS handshakes on
+        # every AI call and caps total connections to the providers.
+        # http2=True lets concurrent LLM calls multiplex over one warm
+        # connection; keepalive_expiry=60 keeps it hot between requests.
+        self.client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(timeout, connect=2.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=100,
+                keepalive_expiry=60.0,
+            ),
+            trust_env=True,
+        )
 
     async def close(self):
         await self.client.aclose()
@@ -147,7 +161,10 @@ class LLMClient:
         if response_format:
             payload.update(response_format)
 
-        r = await self.client.post(url, headers=headers, json=payload)
+        # Serialize once with orjson instead of letting httpx run the
+        # stdlib encoder over the full message history.
+        headers["Content-Type"] = "application/json"
+        r = await self.client.post(url, headers=headers, content=orjson.dumps(payload))
         r.raise_for_status()
         j = r.json()
         return {
@@ -172,7 +189,11 @@ class LLMClient:
         if system:
             payload["systemInstruction"] = system
 
-        r = await self.client.post(url, json=payload)
+        r = await self.client.post(
+            url,
+            headers={"Content-Type": "application/json"},
+            content=orjson.dumps(payload),
+        )
         r.raise_for_status()
         j = r.json()
 
@@ -250,13 +271,24 @@ class LLMClient:
         return out
 
     def _normalize_usage(self, usage: Dict[str, Any]) -> Dict[str, int]:
+        # Keep the prompt/completion split when the provider reports it:
+        # exact counts from the tokenizer that actually billed the call
+        # beat any client-side estimate.
         if not usage:
-            return {"total_tokens": 0}
-        if "totalTokenCount" in usage:
-            return {"total_tokens": int(usage["totalTokenCount"])}
-        if "total_tokens" in usage:
-            return {"total_tokens": int(usage["total_tokens"])}
-        return {"total_tokens": 0}
+            return {"total_tokens": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        if "totalTokenCount" in usage:  # Gemini usageMetadata
+            return {
+                "total_tokens": int(usage.get("totalTokenCount", 0)),
+                "prompt_tokens": int(usage.get("promptTokenCount", 0)),
+                "completion_tokens": int(usage.get("candidatesTokenCount", 0)),
+            }
+        if "total_tokens" in usage:  # OpenAI usage
+            return {
+                "total_tokens": int(usage.get("total_tokens", 0)),
+                "prompt_tokens": int(usage.get("prompt_tokens", 0)),
+                "completion_tokens": int(usage.get("completion_tokens", 0)),
+            }
+        return {"total_tokens": 0, "prompt_tokens": 0, "completion_tokens": 0}
 
     def _retry_after(self, response: httpx.Response) -> Optional[int]:
         try:
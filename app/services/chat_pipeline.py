@@ -1,9 +1,10 @@
 # backend/app/services/chat_pipeline.py
 
 import logging
-import json
 import re
 import uuid
+
+import orjson
 from typing import Dict, Any, List, Optional
 
 from app.core.config import settings
@@ -47,6 +48,58 @@ KEYWORDS_REASONING = {
     "suggest", "should i"
 }
 
+# Compiled alternations over the phrase sets: classification becomes one
+# C-level scan of the message instead of a Python `in` check per phrase,
+# and these run on every chat turn.
+_CORE_METRICS_RE = re.compile("|".join(map(re.escape, CORE_METRICS)))
+_DATA_QUALIFIER_RE = re.compile("|".join(map(re.escape, (
+    " on ", " by ", " per ", " when ", " where ", " strategy", " tag", " symbol"
+))))
+_KEYWORDS_DATA_RE = re.compile("|".join(map(re.escape, KEYWORDS_DATA)))
+_KEYWORDS_REASONING_RE = re.compile("|".join(map(re.escape, KEYWORDS_REASONING)))
+
+# -------------------------
+# STATIC PROMPTS
+# -------------------------
+# Built once at import and sent byte-identical on every call. Providers
+# (OpenAI, Gemini 2.5) cache prompt prefixes server-side keyed on exact
+# prefix bytes, so keeping these stable — and putting dynamic content
+# AFTER the static text — lets repeat calls reuse the prefill instead of
+# re-processing the instructions each turn.
+CLASSIFY_PROMPT = """
+Classify the user request into exactly ONE of these types.
+Return JSON ONLY.
+
+TYPES:
+- STANDARD_METRICS
+- DATA_QUERY
+- REASONING_ONLY
+- GENERAL
+
+Return format:
+{ "type": "...", "args": { } }
+"""
+
+SQL_SYSTEM_PROMPT = f"""
+You generate a single PostgreSQL SELECT (or WITH ... SELECT) query, RAW SQL only.
+SCHEMA: {DB_SCHEMA_CONTEXT}
+RULES:
+- Generate SQL ONLY if data is required. If not, return exactly NO_SQL.
+- Use only SELECT / WITH ... SELECT.
+- ALWAYS include `user_id = $1` in any WHERE clause.
+- Prefer aggregates (SUM, AVG, COUNT).
+- No destructive operations.
+"""
+
+SYNTH_SYSTEM_PREFIX = """
+You are a concise, factual Trading Analyst. Use ONLY the provided context data to answer.
+RULES:
+- If status == 'error', explain the error.
+- If data is empty, say "I found no matching trades."
+- Round numeric values to 2 decimals.
+CONTEXT:
+"""
+
 # -------------------------
 # SAFE JSON EXTRACTION
 # -------------------------
@@ -67,7 +120,7 @@ def extract_json_object(text: str) -> Dict[str, Any]:
     s = _strip_code_fences_and_data_prefixes(text)
 
     if s.startswith("{") and s.endswith("}"):
-        return json.loads(s)
+        return orjson.loads(s)
 
     start = s.find("{")
     if start == -1:
@@ -82,7 +135,7 @@ def extract_json_object(text: str) -> Dict[str, Any]:
             depth -= 1
             if depth == 0:
                 candidate = s[start : i + 1]
-                return json.loads(candidate)
+                return orjson.loads(candidate)
 
     raise ValueError("Unbalanced JSON braces in LLM response")
 
@@ -122,6 +175,29 @@ def estimate_tokens_from_messages(messages: List[Dict[str, str]]) -> int:
     text = " ".join(m.get("content", "") for m in messages)
     return max(1, int(len(text) / 4))
 
+async def _rollback_reserved_tokens(user_id: str, reserved: int) -> None:
+    """
+    Restore tokens reserved for a failed LLM call (DB + profile cache),
+    so the user isn't unfairly blocked by a provider error.
+    """
+    try:
+        new_val = await db.fetch_val(
+            """
+            UPDATE public.user_profiles
+            SET monthly_ai_tokens_used = GREATEST(0, monthly_ai_tokens_used - $2)
+            WHERE id = $1
+            RETURNING monthly_ai_tokens_used
+            """,
+            user_id,
+            reserved,
+        )
+        if new_val is not None:
+            update_user_cache(user_id, {"monthly_ai_tokens_used": new_val})
+            logger.info("Rolled back reserved tokens for user %s", user_id)
+    except Exception:
+        logger.exception("Failed to rollback reserved tokens")
+
+
 async def llm_safe_call(
     user_profile: Dict[str, Any],  # ✅ Accept Profile (No DB Fetch)
     messages: List[Dict[str, str]],
@@ -147,14 +223,21 @@ async def llm_safe_call(
         # 3. Call Provider
         resp = await llm_client.generate_response(messages, model=model)
         content = resp.get("content", "")
-        actual_output_tokens = max(0, int(len(content) / 4))
+
+        # Prefer the provider's own token counts (exact, from the billing
+        # tokenizer) over the len/4 heuristic, which under-counts by ~30%
+        # on non-English text. The heuristic stays as the pre-call
+        # estimate and as the fallback when usage isn't reported.
+        usage = resp.get("usage") or {}
+        actual_output_tokens = usage.get("completion_tokens") or max(0, int(len(content) / 4))
+        actual_input_tokens = usage.get("prompt_tokens") or input_tokens
 
         # 4. Async Logging (Fire & Forget)
         try:
             await MetricsEngine.log_ai_usage(
                 user_id=user_id,
                 model=model,
-                input_tokens=input_tokens,
+                input_tokens=actual_input_tokens,
                 output_tokens=actual_output_tokens,
                 latency_ms=0.0,
                 provider=resp.get("provider", getattr(llm_client, "last_provider", "unknown")),
@@ -170,25 +253,7 @@ async def llm_safe_call(
 
         # 5. Rollback Logic (DB + Cache)
         # We must restore the tokens to prevent unfair blocking.
-        try:
-            new_val = await db.fetch_val(
-                """
-                UPDATE public.user_profiles
-                SET monthly_ai_tokens_used = GREATEST(0, monthly_ai_tokens_used - $2)
-                WHERE id = $1
-                RETURNING monthly_ai_tokens_used
-                """,
-                user_id,
-                estimated_total,
-            )
-            
-            # ✅ Sync Cache so the user isn't blocked in RAM
-            if new_val is not None:
-                update_user_cache(user_id, {"monthly_ai_tokens_used": new_val})
-                logger.info("Rolled back reserved tokens for user %s", user_id)
-                
-        except Exception:
-            logger.exception("Failed to rollback reserved tokens")
+        await _rollback_reserved_tokens(user_id, estimated_total)
 
         raise
 
@@ -209,8 +274,67 @@ class ChatPipeline:
         """
         user_id = user_profile["user_id"]
         request_id = str(uuid.uuid4())
-        
-        # 1. Classify
+
+        # 1. Classify + gather context
+        context = await ChatPipeline._build_context(user_id, message, request_id)
+
+        # 2. Synthesize
+        return await ChatPipeline._synthesize_answer(user_profile, message, context, history, request_id=request_id)
+
+    @staticmethod
+    async def process_stream(
+        user_profile: Dict[str, Any],
+        message: str,
+        history: List[Dict[str, str]],
+    ):
+        """
+        Streaming variant of process(): identical classify/context work,
+        but synthesis tokens are yielded as the provider produces them so
+        the caller can flush them to the client (SSE). Reservation and
+        rollback semantics match llm_safe_call.
+        """
+        user_id = user_profile["user_id"]
+        request_id = str(uuid.uuid4())
+
+        context = await ChatPipeline._build_context(user_id, message, request_id)
+        messages = ChatPipeline._build_synthesis_messages(message, context, history)
+
+        input_tokens = estimate_tokens_from_messages(messages)
+        estimated_total = input_tokens + input_tokens + 10
+        await QuotaManager.reserve_ai_tokens(user_id, user_profile, estimated_total)
+
+        parts: List[str] = []
+        try:
+            async for chunk, _meta in llm_client.stream_response(messages, model=DEFAULT_MODEL):
+                if chunk:
+                    parts.append(chunk)
+                    yield chunk
+        except Exception:
+            logger.exception(
+                "Streaming synthesis failed; attempting rollback",
+                extra={"request_id": request_id, "user_id": user_id},
+            )
+            await _rollback_reserved_tokens(user_id, estimated_total)
+            raise
+
+        # Usage logging mirrors llm_safe_call; streams report no provider
+        # counts, so the length heuristic stands in.
+        content = "".join(parts)
+        try:
+            await MetricsEngine.log_ai_usage(
+                user_id=user_id,
+                model=DEFAULT_MODEL,
+                input_tokens=input_tokens,
+                output_tokens=max(0, int(len(content) / 4)),
+                latency_ms=0.0,
+                provider=settings.LLM_PROVIDER,
+                context="chat_pipeline_stream",
+            )
+        except Exception:
+            pass
+
+    @staticmethod
+    async def _build_context(user_id: str, message: str, request_id: str) -> Dict[str, Any]:
         intent = await ChatPipeline._classify_intent(message)
         intent_type = intent.get("type", "GENERAL")
         intent_args = intent.get("args", {})
@@ -246,8 +370,7 @@ class ChatPipeline:
             logger.exception("ChatPipeline execution error", extra={"request_id": request_id, "user_id": user_id})
             context = {"status": "error", "message": "Internal processing error."}
 
-        # 2. Synthesize
-        return await ChatPipeline._synthesize_answer(user_profile, message, context, history, request_id=request_id)
+        return context
 
     # -------------------------
     # INTENT CLASSIFICATION
@@ -256,31 +379,17 @@ class ChatPipeline:
     async def _classify_intent(message: str) -> Dict[str, Any]:
         text = message.lower().strip()
 
-        if any(k in text for k in CORE_METRICS):
-            if any(x in text for x in [" on ", " by ", " per ", " when ", " where ", " strategy", " tag", " symbol"]):
+        if _CORE_METRICS_RE.search(text):
+            if _DATA_QUALIFIER_RE.search(text):
                 return {"type": "DATA_QUERY"}
             return {"type": "STANDARD_METRICS", "args": {"period": "ALL_TIME"}}
 
         if text in {"hi", "hello", "hey"}:
             return {"type": "GENERAL"}
 
-        prompt = """
-        Classify the user request into exactly ONE of these types.
-        Return JSON ONLY.
-
-        TYPES:
-        - STANDARD_METRICS
-        - DATA_QUERY
-        - REASONING_ONLY
-        - GENERAL
-
-        Return format:
-        { "type": "...", "args": { } }
-        """
-
         try:
             resp = await llm_client.generate_response(
-                [{"role": "system", "content": prompt}, {"role": "user", "content": message}],
+                [{"role": "system", "content": CLASSIFY_PROMPT}, {"role": "user", "content": message}],
                 model=DEFAULT_MODEL,
             )
             content = resp.get("content", "")
@@ -297,9 +406,9 @@ class ChatPipeline:
     @staticmethod
     async def _decide_data_needed(message: str) -> bool:
         t = message.lower()
-        if any(k in t for k in KEYWORDS_DATA):
+        if _KEYWORDS_DATA_RE.search(t):
             return True
-        if any(k in t for k in KEYWORDS_REASONING):
+        if _KEYWORDS_REASONING_RE.search(t):
             return False
 
         prompt = f"Does this message require querying the user's database? Answer YES or NO only.\n\nMessage: \"{message}\""
@@ -317,19 +426,9 @@ class ChatPipeline:
     # -------------------------
     @staticmethod
     async def _generate_sql(message: str) -> str:
-        system_prompt = f"""
-        You generate a single PostgreSQL SELECT (or WITH ... SELECT) query, RAW SQL only.
-        SCHEMA: {DB_SCHEMA_CONTEXT}
-        RULES:
-        - Generate SQL ONLY if data is required. If not, return exactly NO_SQL.
-        - Use only SELECT / WITH ... SELECT.
-        - ALWAYS include `user_id = $1` in any WHERE clause.
-        - Prefer aggregates (SUM, AVG, COUNT).
-        - No destructive operations.
-        """
         try:
             resp = await llm_client.generate_response(
-                [{"role": "system", "content": system_prompt}, {"role": "user", "content": message}],
+                [{"role": "system", "content": SQL_SYSTEM_PROMPT}, {"role": "user", "content": message}],
                 model=DEFAULT_MODEL,
             )
             sql = resp.get("content", "").replace("```sql", "").replace("```", "").strip()
@@ -341,13 +440,11 @@ class ChatPipeline:
     # SYNTHESIS (LLM for final answer)
     # -------------------------
     @staticmethod
-    async def _synthesize_answer(
-        user_profile: Dict[str, Any], # ✅ Accepts Profile
+    def _build_synthesis_messages(
         message: str,
         context: Dict[str, Any],
         history: List[Dict[str, str]],
-        request_id: Optional[str] = None,
-    ) -> str:
+    ) -> List[Dict[str, str]]:
         # Compact context
         safe_context = dict(context)
         if isinstance(safe_context.get("data"), list):
@@ -356,18 +453,23 @@ class ChatPipeline:
         if "preferences" in safe_context:
             safe_context["preferences"] = "[REDACTED]"
 
-        system_prompt = f"""
-        You are a concise, factual Trading Analyst. Use ONLY the provided context data to answer.
-        CONTEXT:
-        {json.dumps(safe_context, default=str)[:30_000]}
-        RULES:
-        - If status == 'error', explain the error.
-        - If data is empty, say "I found no matching trades."
-        - Round numeric values to 2 decimals.
-        """
+        # Static instructions first, per-turn context last: the prompt
+        # prefix stays byte-stable across turns for provider-side caching.
+        system_prompt = SYNTH_SYSTEM_PREFIX + orjson.dumps(safe_context, default=str).decode()[:30_000]
         messages = [{"role": "system", "content": system_prompt}]
         messages.extend(history[-2:] if history else [])
         messages.append({"role": "user", "content": message})
+        return messages
+
+    @staticmethod
+    async def _synthesize_answer(
+        user_profile: Dict[str, Any], # ✅ Accepts Profile
+        message: str,
+        context: Dict[str, Any],
+        history: List[Dict[str, str]],
+        request_id: Optional[str] = None,
+    ) -> str:
+        messages = ChatPipeline._build_synthesis_messages(message, context, history)
 
         try:
             # ✅ Use Safe Call with Profile (No extra DB fetch)
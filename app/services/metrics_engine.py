@@ -25,7 +25,8 @@ class MetricsEngine:
     # OPTIMIZATION CONFIG: Batch Buffering
     # ------------------------------------------------------------------
     BATCH_SIZE = 20  # Flush after this many logs
-    
+    MAX_BUFFER = 10_000  # Hard cap: drop oldest entries if DB is down
+
     _AI_LOG_BUFFER: List[tuple] = []
     _TELEMETRY_BUFFER: List[tuple] = []
     
@@ -78,12 +79,15 @@ class MetricsEngine:
             datetime.now(timezone.utc)
         )
 
-        # Add to Buffer safely
+        # Add to Buffer safely (bounded: shed oldest if DB is unreachable)
         cls._AI_LOG_BUFFER.append(log_entry)
+        if len(cls._AI_LOG_BUFFER) > cls.MAX_BUFFER:
+            del cls._AI_LOG_BUFFER[: len(cls._AI_LOG_BUFFER) - cls.MAX_BUFFER]
 
-        # Check if flush is needed
+        # Flush off the request path: the unlucky caller that crosses the
+        # threshold should not pay for the bulk insert round-trip.
         if len(cls._AI_LOG_BUFFER) >= cls.BATCH_SIZE:
-            await cls.flush_ai_logs()
+            asyncio.create_task(cls.flush_ai_logs())
 
     @classmethod
     async def flush_ai_logs(cls):
@@ -132,15 +136,18 @@ class MetricsEngine:
             user_id,
             event_type,
             category,
-            json.dumps(details) if details else "{}",
+            details or {},  # bound as jsonb via the pool's orjson codec
             path,
             datetime.now(timezone.utc)
         )
 
         cls._TELEMETRY_BUFFER.append(entry)
+        if len(cls._TELEMETRY_BUFFER) > cls.MAX_BUFFER:
+            del cls._TELEMETRY_BUFFER[: len(cls._TELEMETRY_BUFFER) - cls.MAX_BUFFER]
 
+        # Fire-and-forget flush — see log_ai_usage.
         if len(cls._TELEMETRY_BUFFER) >= cls.BATCH_SIZE:
-            await cls.flush_telemetry()
+            asyncio.create_task(cls.flush_telemetry())
 
     @classmethod
     async def flush_telemetry(cls):
@@ -47,19 +47,29 @@ class QuotaManager:
         """
         Resolves the effective plan ID from the user context.
         Handles aliases (e.g. LIFETIME -> PREMIUM).
+
+        Memoized on the user dict itself: endpoints like create_trade run
+        several plan/feature checks per request, and the dict is rebuilt
+        per request by get_current_user, so the cache scope is exactly
+        one request.
         """
+        cached = user_profile.get("_resolved_plan")
+        if cached:
+            return cached
+
         raw_plan = (
-            user_profile.get("plan_tier") or 
-            user_profile.get("active_plan_id") or 
+            user_profile.get("plan_tier") or
+            user_profile.get("active_plan_id") or
             user_profile.get("plan_id") or
-            user_profile.get("plan") or 
+            user_profile.get("plan") or
             settings.DEFAULT_PLAN
         ).upper()
-        
+
         # Normalize Legacy/Alias plans
         if raw_plan in ("FOUNDER", "LIFETIME", "LIFETIME_PRO"):
-            return "PREMIUM"
-            
+            raw_plan = "PREMIUM"
+
+        user_profile["_resolved_plan"] = raw_plan
         return raw_plan
 
     @staticmethod
@@ -193,15 +203,15 @@ class QuotaManager:
     # 4. Database Bound Checks (Trades/Strategies)
     # --------------------------------------------------------------
     @staticmethod
-    async def check_trade_limit(user: Dict[str, Any]) -> None:
+    async def check_trade_limit(user: Dict[str, Any], incoming: int = 1) -> None:
         """
-        Checks if user has reached monthly trade limit.
+        Checks if user can add `incoming` more trades this month.
         Premium users skip the count query.
         """
         plan = QuotaManager._plan(user)
         limits = QuotaManager.limits(plan)
         max_trades = limits.get("max_trades_per_month")
-        
+
         # ✅ FAST PATH: Premium users skip the COUNT(*) query
         if max_trades is None:
             return
@@ -209,12 +219,12 @@ class QuotaManager:
         # Only run Count Query for Free/Pro users
         user_id = user["user_id"]
         count = await db.fetch_val("""
-            SELECT COUNT(*) FROM trades 
-            WHERE user_id = $1 
+            SELECT COUNT(*) FROM trades
+            WHERE user_id = $1
             AND created_at >= date_trunc('month', NOW())
         """, user_id)
-        
-        if count >= max_trades:
+
+        if count + incoming > max_trades:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS, 
                 detail=f"Monthly trade limit ({max_trades}) reached."
@@ -272,6 +282,66 @@ class QuotaManager:
             logger.exception("Failed to increment chat counter")
             pass
 
+    @staticmethod
+    async def append_chat_turn(
+        user_id: str,
+        session_id: str,
+        user_message: str,
+        assistant_message: str,
+        verify_ownership: bool = True,
+    ) -> bool:
+        """
+        Persists a full chat turn (user + assistant rows) AND bumps the
+        daily chat counter in a single statement — one round trip instead
+        of an insert plus a counter UPDATE.
+
+        Returns False (and writes nothing) if verify_ownership is set and
+        the session does not belong to the user. Updates the profile
+        cache write-through like the other counters.
+        """
+        guard = (
+            "WHERE EXISTS (SELECT 1 FROM chat_sessions WHERE id = $1 AND user_id = $2)"
+            if verify_ownership else ""
+        )
+        query = f"""
+            WITH ins AS (
+                -- The 1ms offset keeps the assistant row strictly after
+                -- the user row: both arrive in one statement, so without
+                -- it they'd share a created_at and ORDER BY could flip
+                -- them when replaying the transcript.
+                INSERT INTO chat_messages (session_id, user_id, role, content, created_at)
+                SELECT $1, $2, r.role, r.content, NOW() + r.ofs
+                FROM (VALUES
+                    ('user', $3::text, interval '0 ms'),
+                    ('assistant', $4::text, interval '1 ms')
+                ) AS r(role, content, ofs)
+                {guard}
+                RETURNING id
+            )
+            UPDATE public.user_profiles
+            SET daily_chat_count =
+                CASE
+                    WHEN last_chat_reset_at IS NULL
+                      OR last_chat_reset_at < date_trunc('day', NOW())
+                    THEN 1
+                    ELSE daily_chat_count + 1
+                END,
+                last_chat_reset_at = NOW()
+            WHERE id = $2 AND (SELECT COUNT(*) FROM ins) > 0
+            RETURNING daily_chat_count
+        """
+        new_count = await db.fetch_val(
+            query, session_id, user_id, user_message, assistant_message
+        )
+        if new_count is None:
+            return False
+
+        update_user_cache(user_id, {
+            "daily_chat_count": new_count,
+            "last_chat_reset_at": datetime.now()  # Approximate is fine for cache
+        })
+        return True
+
     @staticmethod
     async def increment_csv_import(user_id: str) -> None:
         try:
@@ -1,8 +1,11 @@
 import logging
+import logging.handlers
+import queue
 import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
@@ -13,10 +16,13 @@ from app.core.exception import register_exception_handlers
 from app.apis.v1 import api_router as api_v1_router
 
 # ✅ NEW IMPORTS for Optimization & Monitoring
-from app.core.middleware import APIMonitorMiddleware
+from app.core.middleware import APIMonitorMiddleware, MaxBodySizeMiddleware
 from app.services.performance_monitor import PerformanceMonitor
 from app.services.metrics_engine import MetricsEngine
 from app.services.analytics import Analytics  # ✅ Analytics Import
+from app.lib.llm_client import llm_client
+from app.apis.v1 import trades, brokers
+from app.lib.brokers import base as broker_base
 
 # ✅ NEW IMPORTS for Rate Limiting
 from slowapi import _rate_limit_exceeded_handler
@@ -24,11 +30,24 @@ from slowapi.errors import RateLimitExceeded
 from app.core.limiter import limiter
 
 # --------------------------------------------------------------------------
-# Logging Setup
+# Logging Setup (Queued / Non-Blocking)
 # --------------------------------------------------------------------------
+# Handlers write to the stream under a lock; at scale that serializes every
+# request on log I/O. Route records through a queue so a worker thread does
+# the actual writing and the event loop never blocks on a log line.
+_log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(
+    logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+)
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, _stream_handler, respect_handler_level=True
+)
+_log_listener.start()
+
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+    handlers=[logging.handlers.QueueHandler(_log_queue)],
 )
 logger = logging.getLogger("tradeomen.main")
 
@@ -65,10 +84,19 @@ async def lifespan(app: FastAPI):
     
     # 💾 Force flush any buffered logs/metrics to DB
     await MetricsEngine.force_flush_all()
-    
+
+    # 🔌 Close the pooled HTTP clients (keep-alive connections)
+    await llm_client.close()
+    await trades._storage_http.aclose()
+    await brokers._postgrest_http.aclose()
+    await broker_base._broker_http.aclose()
+
     await db.disconnect()
     logger.info("🛑 Database disconnected")
 
+    # 📝 Drain remaining log records before the process exits
+    _log_listener.stop()
+
 
 # --------------------------------------------------------------------------
 # App Initialization
@@ -78,6 +106,9 @@ app = FastAPI(
     version="1.0.0",
     description="Industry-grade SaaS Trading Journal Backend",
     lifespan=lifespan,
+    # orjson handles datetime/UUID natively and encodes in C — cheaper
+    # than the stdlib encoder on every response body.
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.ENVIRONMENT != "production" else None,
     redoc_url="/redoc" if settings.ENVIRONMENT != "production" else None,
 )
@@ -94,6 +125,9 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 # Middleware (Order Matters!)
 # --------------------------------------------------------------------------
 
+# 0. Security: Body Size Cap (reject oversized uploads before buffering)
+app.add_middleware(MaxBodySizeMiddleware, max_bytes=settings.MAX_REQUEST_BODY_BYTES)
+
 # 1. Security: Trusted Hosts
 app.add_middleware(
     TrustedHostMiddleware, 
@@ -101,7 +135,10 @@ app.add_middleware(
 )
 
 # 2. Performance: GZip Compression
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# 512-byte threshold: broker/strategy lists with a handful of rows sit
+# just under 1KB of repetitive JSON keys and still compress >5:1, while
+# genuinely tiny status bodies stay untouched.
+app.add_middleware(GZipMiddleware, minimum_size=512)
 
 # 3. Connectivity: CORS
 allow_origins = [